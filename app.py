@@ -1,9 +1,15 @@
 import os
 from flask import Flask, redirect, url_for, render_template
 from flask_login import LoginManager, current_user
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import config
+from auth import user_cache
+from booking import cache as booking_cache
 from database.db import db
-from database.models import User
+from database import engine, migrations, routing
+from monitoring import metrics, profiling, sql as sql_monitoring
+from utils import archive, assets, compression, jobs, outbox, passwords, reminders, templating
+from utils.ratelimit import limiter
 
 
 def create_app(config_name=None):
@@ -12,17 +18,33 @@ def create_app(config_name=None):
 
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if app.config['TRUSTED_PROXIES']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
 
     # Init extensions
     db.init_app(app)
+    engine.init_app(app)
+    routing.init_app(app)
+    migrations.init_app(app)
+    sql_monitoring.init_app(app)
+    metrics.init_app(app)
+    profiling.init_app(app)
+    outbox.init_app(app)
+    reminders.init_app(app)
+    jobs.init_app(app)
+    archive.init_app(app)
+    passwords.init_app(app)
+    limiter.init_app(app)
+    booking_cache.init_app(app)
+    assets.init_app(app)
+    compression.init_app(app)
     login_manager = LoginManager()
     login_manager.login_view = 'auth.login'
     login_manager.login_message_category = 'error'
     login_manager.init_app(app)
 
-    @login_manager.user_loader
-    def load_user(user_id):
-        return User.query.get(int(user_id))
+    user_cache.init_app(app)
+    login_manager.user_loader(user_cache.load_user)
 
     # Register blueprints
     from auth.routes import auth_bp
@@ -58,45 +80,13 @@ def create_app(config_name=None):
             return redirect(url_for('dashboard.index'))
         return render_template('landing.html')
 
-    # Create tables and run migrations
-    with app.app_context():
-        db.create_all()
-
-        # Auto-migration: add missing columns to existing tables
-        try:
-            from sqlalchemy import text, inspect
-            inspector = inspect(db.engine)
-            columns = [col['name'] for col in inspector.get_columns('users')]
-
-            if 'default_meeting_link' not in columns:
-                db.session.execute(text(
-                    "ALTER TABLE users ADD COLUMN default_meeting_link VARCHAR(500) DEFAULT ''"
-                ))
-                db.session.commit()
-                print("Migration: Added default_meeting_link column to users table")
-
-            if 'meeting_link' not in [col['name'] for col in inspector.get_columns('sessions')]:
-                db.session.execute(text(
-                    "ALTER TABLE sessions ADD COLUMN meeting_link VARCHAR(500) DEFAULT ''"
-                ))
-                db.session.commit()
-                print("Migration: Added meeting_link column to sessions table")
-
-            if 'onboarding_step' not in columns:
-                db.session.execute(text(
-                    "ALTER TABLE users ADD COLUMN onboarding_step INTEGER DEFAULT 1"
-                ))
-                db.session.commit()
-                print("Migration: Added onboarding_step column to users table")
-
-            if 'onboarding_completed' not in columns:
-                db.session.execute(text(
-                    "ALTER TABLE users ADD COLUMN onboarding_completed BOOLEAN DEFAULT FALSE"
-                ))
-                db.session.commit()
-                print("Migration: Added onboarding_completed column to users table")
-        except Exception as e:
-            print(f"Migration check: {e}")
+    # Last, so templates from every blueprint are precompiled
+    templating.init_app(app)
+
+    # Schema changes run via `flask migrate`; only dev applies them on boot
+    if app.config.get('AUTO_MIGRATE'):
+        with app.app_context():
+            migrations.run_migrations()
 
     return app
 
@@ -0,0 +1,104 @@
+/*
+ * Build the self-hosted static assets into ../static/dist:
+ *
+ *   app.<hash>.css    Tailwind compiled from the classes used in templates/
+ *   icons.<hash>.js   window.lucide.createIcons() with only the icons templates use
+ *
+ * Each file gets precompressed .gz and .br siblings, and manifest.json maps
+ * logical names (app.css, icons.js) to hashed filenames for utils/assets.py.
+ *
+ *   cd assets && npm install && npm run build
+ */
+
+import { execFileSync } from 'node:child_process';
+import { createHash } from 'node:crypto';
+import fs from 'node:fs';
+import path from 'node:path';
+import { fileURLToPath } from 'node:url';
+import zlib from 'node:zlib';
+
+const here = path.dirname(fileURLToPath(import.meta.url));
+const templatesDir = path.join(here, '..', 'templates');
+const outDir = path.join(here, '..', 'static', 'dist');
+
+function walk(dir) {
+  return fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const full = path.join(dir, entry.name);
+    return entry.isDirectory() ? walk(full) : [full];
+  });
+}
+
+function buildCss() {
+  const tmp = path.join(outDir, '.app.css');
+  execFileSync(
+    path.join(here, 'node_modules', '.bin', 'tailwindcss'),
+    ['-c', 'tailwind.config.js', '-i', 'input.css', '-o', tmp, '--minify'],
+    { cwd: here, stdio: 'inherit' },
+  );
+  const css = fs.readFileSync(tmp);
+  fs.rmSync(tmp);
+  return css;
+}
+
+function buildIcons() {
+  const names = new Set();
+  for (const file of walk(templatesDir).filter((f) => f.endsWith('.html'))) {
+    for (const match of fs.readFileSync(file, 'utf8').matchAll(/data-lucide=["']([a-z0-9-]+)["']/g)) {
+      names.add(match[1]);
+    }
+  }
+  const iconDir = path.join(here, 'node_modules', 'lucide-static', 'icons');
+  const missing = [...names].filter((name) => !fs.existsSync(path.join(iconDir, `${name}.svg`)));
+  if (missing.length) {
+    throw new Error(`Icons not in lucide-static: ${missing.join(', ')}`);
+  }
+  const icons = {};
+  for (const name of [...names].sort()) {
+    const svg = fs.readFileSync(path.join(iconDir, `${name}.svg`), 'utf8');
+    icons[name] = svg.replace(/^[\s\S]*?<svg[^>]*>/, '').replace(/<\/svg>\s*$/, '').replace(/\s*\n\s*/g, '');
+  }
+  // Same markup lucide's createIcons() produces, for the subset above
+  const js = `(function () {
+  var icons = ${JSON.stringify(icons)};
+  var defaults = {xmlns: 'http://www.w3.org/2000/svg', width: 24, height: 24, viewBox: '0 0 24 24',
+    fill: 'none', stroke: 'currentColor', 'stroke-width': 2, 'stroke-linecap': 'round', 'stroke-linejoin': 'round'};
+  function createIcons() {
+    document.querySelectorAll('[data-lucide]').forEach(function (el) {
+      var name = el.getAttribute('data-lucide');
+      if (!icons[name]) return;
+      var svg = document.createElementNS('http://www.w3.org/2000/svg', 'svg');
+      Object.keys(defaults).forEach(function (key) { svg.setAttribute(key, defaults[key]); });
+      Array.prototype.forEach.call(el.attributes, function (attr) {
+        if (attr.name !== 'data-lucide' && attr.name !== 'class') svg.setAttribute(attr.name, attr.value);
+      });
+      svg.setAttribute('class', ('lucide lucide-' + name + ' ' + (el.getAttribute('class') || '')).trim());
+      svg.innerHTML = icons[name];
+      el.parentNode.replaceChild(svg, el);
+    });
+  }
+  window.lucide = {createIcons: createIcons};
+})();
+`;
+  return Buffer.from(js);
+}
+
+function write(logicalName, content, manifest) {
+  const hash = createHash('sha256').update(content).digest('hex').slice(0, 10);
+  const ext = path.extname(logicalName);
+  const filename = `${path.basename(logicalName, ext)}.${hash}${ext}`;
+  const target = path.join(outDir, filename);
+  fs.writeFileSync(target, content);
+  fs.writeFileSync(`${target}.gz`, zlib.gzipSync(content, { level: 9 }));
+  fs.writeFileSync(`${target}.br`, zlib.brotliCompressSync(content, {
+    params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 11 },
+  }));
+  manifest[logicalName] = filename;
+  console.log(`${filename}  ${content.length} B`);
+}
+
+fs.rmSync(outDir, { recursive: true, force: true });
+fs.mkdirSync(outDir, { recursive: true });
+const manifest = {};
+write('app.css', buildCss(), manifest);
+write('icons.js', buildIcons(), manifest);
+fs.writeFileSync(path.join(outDir, 'manifest.json'), `${JSON.stringify(manifest, null, 2)}\n`);
@@ -0,0 +1,77 @@
+/*
+ * Sanity-check ../static/dist after build.mjs, so a broken Tailwind or
+ * lucide-static release fails the image build instead of shipping unstyled
+ * pages:
+ *
+ *   - manifest.json names a non-empty app.css and icons.js
+ *   - every class in templates/ that uses the shared theme colours
+ *     (surface, primary, accent, txt) has a rule in app.css, which shows the
+ *     content globs and tailwind.config.js were both picked up
+ *   - every data-lucide icon in templates/ is bundled in icons.js
+ *
+ *   cd assets && npm run build && npm run check
+ */
+
+import fs from 'node:fs';
+import path from 'node:path';
+import { fileURLToPath } from 'node:url';
+
+const here = path.dirname(fileURLToPath(import.meta.url));
+const templatesDir = path.join(here, '..', 'templates');
+const outDir = path.join(here, '..', 'static', 'dist');
+
+const THEME_CLASS = /^[a-z]+(?:-[a-z]+)?-(?:surface|primary|accent|txt)(?:-[a-z0-9]+)?(?:\/\d+)?$/;
+
+function walk(dir) {
+  return fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const full = path.join(dir, entry.name);
+    return entry.isDirectory() ? walk(full) : [full];
+  });
+}
+
+function read(logicalName, manifest) {
+  const filename = manifest[logicalName];
+  if (!filename) {
+    throw new Error(`manifest.json has no ${logicalName}`);
+  }
+  const content = fs.readFileSync(path.join(outDir, filename), 'utf8');
+  if (!content.trim()) {
+    throw new Error(`${filename} is empty`);
+  }
+  return content;
+}
+
+// Tailwind's selector for a class name, e.g. hover:bg-primary/10 -> .hover\:bg-primary\/10
+function selector(className) {
+  return `.${className.replace(/[:/.]/g, (c) => `\\${c}`)}`;
+}
+
+const manifest = JSON.parse(fs.readFileSync(path.join(outDir, 'manifest.json'), 'utf8'));
+const css = read('app.css', manifest);
+const js = read('icons.js', manifest);
+
+const themeClasses = new Set();
+const icons = new Set();
+for (const file of walk(templatesDir).filter((f) => f.endsWith('.html'))) {
+  const html = fs.readFileSync(file, 'utf8');
+  for (const match of html.matchAll(/class="([^"]*)"/g)) {
+    for (const token of match[1].split(/\s+/)) {
+      // Skip Jinja fragments; the variant prefix doesn't affect the theme lookup
+      if (!/[{}%[]/.test(token) && THEME_CLASS.test(token.split(':').pop())) {
+        themeClasses.add(token);
+      }
+    }
+  }
+  for (const match of html.matchAll(/data-lucide=["']([a-z0-9-]+)["']/g)) {
+    icons.add(match[1]);
+  }
+}
+
+const missingCss = [...themeClasses].filter((name) => !css.includes(selector(name))).sort();
+const missingIcons = [...icons].filter((name) => !js.includes(JSON.stringify(name) + ':')).sort();
+if (missingCss.length || missingIcons.length) {
+  if (missingCss.length) console.error(`Classes missing from app.css: ${missingCss.join(' ')}`);
+  if (missingIcons.length) console.error(`Icons missing from icons.js: ${missingIcons.join(' ')}`);
+  process.exit(1);
+}
+console.log(`static/dist OK: ${themeClasses.size} theme classes, ${icons.size} icons`);
@@ -0,0 +1,21 @@
+/** Shared theme for every template (formerly inline `tailwind.config` blocks). */
+module.exports = {
+  content: {
+    relative: true,
+    files: ['../templates/**/*.html'],
+  },
+  theme: {
+    extend: {
+      fontFamily: {
+        sans: ['Inter', 'system-ui', 'sans-serif'],
+        serif: ['Instrument Serif', 'Georgia', 'serif'],
+      },
+      colors: {
+        surface: { DEFAULT: '#0a0a12', 50: '#0f0f1a', 100: '#16162a', 200: '#1e1e3a' },
+        primary: { DEFAULT: '#6366f1', light: '#818cf8', dark: '#4f46e5' },
+        accent: { DEFAULT: '#a855f7', light: '#c084fc', cyan: '#22d3ee' },
+        txt: { primary: '#f1f5f9', secondary: '#94a3b8', muted: '#64748b' },
+      },
+    },
+  },
+};
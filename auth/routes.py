@@ -1,19 +1,14 @@
-import re
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from database.db import db
 from database.models import User
+from auth.utils import assign_unique_slug, claim_slug, slugify
+from utils.passwords import HashingBusy, hasher
+from utils.ratelimit import limiter
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
 
-def slugify(text):
-    text = text.lower().strip()
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[\s_]+', '-', text)
-    return text
-
-
 @auth_bp.route('/signup', methods=['GET', 'POST'])
 def signup():
     if current_user.is_authenticated:
@@ -36,17 +31,13 @@ def signup():
             flash('An account with this email already exists.', 'error')
             return render_template('auth/signup.html')
 
-        # Generate unique slug
-        base_slug = slugify(full_name)
-        slug = base_slug
-        counter = 1
-        while User.query.filter_by(profile_slug=slug).first():
-            slug = f'{base_slug}-{counter}'
-            counter += 1
-
-        user = User(email=email, full_name=full_name, profile_slug=slug)
-        user.set_password(password)
-        db.session.add(user)
+        user = User(email=email, full_name=full_name)
+        try:
+            user.set_password(password)
+        except HashingBusy:
+            flash('We are handling a lot of sign-ins right now. Please try again in a moment.', 'error')
+            return render_template('auth/signup.html'), 503, {'Retry-After': '5'}
+        assign_unique_slug(user, full_name)
         db.session.commit()
 
         login_user(user)
@@ -56,6 +47,14 @@ def signup():
     return render_template('auth/signup.html')
 
 
+def _login_retry_after(email):
+    """Spend a token from the client IP and email buckets; seconds to wait if either is empty."""
+    config = current_app.config
+    ip_ok, ip_wait = limiter.hit(f'login-ip:{request.remote_addr}', *config['LOGIN_IP_LIMIT'])
+    email_ok, email_wait = limiter.hit(f'login-email:{email}', *config['LOGIN_EMAIL_LIMIT'])
+    return 0 if ip_ok and email_ok else max(ip_wait, email_wait)
+
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
@@ -65,8 +64,27 @@ def login():
         email = request.form.get('email', '').strip().lower()
         password = request.form.get('password', '')
 
+        # Reject floods before spending CPU on a password hash
+        retry_after = _login_retry_after(email)
+        if retry_after:
+            flash(f'Too many login attempts. Please try again in {retry_after} seconds.', 'error')
+            return render_template('auth/login.html'), 429, {'Retry-After': str(retry_after)}
+
         user = User.query.filter_by(email=email).first()
-        if user and user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except HashingBusy:
+            flash('We are handling a lot of sign-ins right now. Please try again in a moment.', 'error')
+            return render_template('auth/login.html'), 503, {'Retry-After': '5'}
+
+        if valid:
+            if hasher.needs_rehash(user.password_hash):
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except HashingBusy:
+                    pass  # upgrade on a later login
+
             login_user(user)
 
             # Auto-complete onboarding for existing users who already have profiles filled
@@ -112,11 +130,9 @@ def profile():
         new_slug = request.form.get('profile_slug', '').strip()
         if new_slug and new_slug != current_user.profile_slug:
             new_slug = slugify(new_slug)
-            existing = User.query.filter_by(profile_slug=new_slug).first()
-            if existing and existing.id != current_user.id:
+            if new_slug and not claim_slug(current_user, new_slug):
                 flash('That profile URL is already taken.', 'error')
                 return render_template('auth/profile.html')
-            current_user.profile_slug = new_slug
 
         db.session.commit()
         flash('Profile updated!', 'success')
@@ -0,0 +1,112 @@
+"""
+Per-process cache for the Flask-Login user loader.
+
+Every authenticated request used to SELECT its ``User`` row. The loader now
+keeps a short-TTL snapshot of the user's column values and rebuilds a
+``User`` from it, attached to the request's session without a query
+(``make_transient_to_detached``). Routes can still assign to
+``current_user`` and commit; only the changed columns are written.
+
+Any flush that updates or deletes a user evicts it here, and again after the
+commit so a concurrent request can't re-cache the old row in between. Other
+gunicorn workers pick up the change when their snapshot expires
+(``USER_CACHE_TTL``, seconds).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached, object_session
+from database.db import db
+from database.models import User
+from database.routing import RoutingSession
+
+
+class UserCache:
+    """Bounded map of user id -> (expires_at, column values)."""
+
+    def __init__(self, ttl=10, max_entries=5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return entry[1]
+
+    def put(self, user_id, values):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+_COLUMNS = [attr.key for attr in User.__mapper__.column_attrs]
+
+
+def load_user(user_id):
+    """Flask-Login user loader backed by ``user_cache``."""
+    user_id = int(user_id)
+    existing = db.session.identity_map.get(
+        User.__mapper__.identity_key_from_primary_key([user_id])
+    )
+    if existing is not None:
+        return existing
+
+    if user_cache.ttl > 0:
+        values = user_cache.get(user_id)
+        if values is not None:
+            user = User(**values)
+            make_transient_to_detached(user)
+            db.session.add(user)
+            return user
+
+    user = db.session.get(User, user_id)
+    if user is not None and user_cache.ttl > 0:
+        user_cache.put(user_id, {key: getattr(user, key) for key in _COLUMNS})
+    return user
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _evict_on_flush(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('evicted_user_ids', set()).add(target.id)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _evict_on_commit(session):
+    for user_id in session.info.pop('evicted_user_ids', ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_evictions(session):
+    session.info.pop('evicted_user_ids', None)
+
+
+def init_app(app):
+    """Set the snapshot lifetime from ``USER_CACHE_TTL`` (0 disables the cache)."""
+    user_cache.ttl = app.config.get('USER_CACHE_TTL', 10)
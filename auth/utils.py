@@ -0,0 +1,80 @@
+import re
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from database.db import db
+from database.models import User
+
+# Numeric suffixes we generate; slugify keeps Unicode digits like '²', which
+# str.isdigit() accepts but int() rejects
+_SUFFIX = re.compile(r'\d+', re.ASCII)
+
+
+def slugify(text):
+    text = text.lower().strip()
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = re.sub(r'[\s_]+', '-', text)
+    return text
+
+
+def next_free_slug(base_slug, user_id=None):
+    """
+    Return ``base_slug`` or the first free ``base_slug-N``, using one prefix
+    query for all existing suffixes. Slugs owned by ``user_id`` count as free.
+    """
+    pattern = base_slug.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '-%'
+    query = db.session.query(User.profile_slug).filter(or_(
+        User.profile_slug == base_slug,
+        User.profile_slug.like(pattern, escape='\\'),
+    ))
+    if user_id is not None:
+        query = query.filter(User.id != user_id)
+    taken = {slug for (slug,) in query}
+
+    if base_slug not in taken:
+        return base_slug
+    suffixes = {
+        int(slug[len(base_slug) + 1:]) for slug in taken
+        if _SUFFIX.fullmatch(slug, len(base_slug) + 1)
+    }
+    counter = 1
+    while counter in suffixes:
+        counter += 1
+    return f'{base_slug}-{counter}'
+
+
+def _flush_slug(user, slug):
+    """Write the slug in a savepoint; False if the unique index rejected it."""
+    if user.id is not None:
+        db.session.flush()  # keep the user's other pending changes out of the savepoint
+    try:
+        with db.session.begin_nested():
+            user.profile_slug = slug
+            db.session.add(user)
+    except IntegrityError:
+        if next_free_slug(slug, user_id=user.id) == slug:
+            raise  # a different constraint failed
+        return False
+    return True
+
+
+def claim_slug(user, slug):
+    """
+    Give ``user`` the exact slug they asked for. Returns False if another
+    tutor has it, including one who took it a moment ago.
+    """
+    if next_free_slug(slug, user_id=user.id) != slug:
+        return False
+    return _flush_slug(user, slug)
+
+
+def assign_unique_slug(user, text, retries=5):
+    """
+    Give ``user`` the first free slug derived from ``text``. If a concurrent
+    signup takes it first, the next free one is tried.
+    """
+    base_slug = slugify(text) or 'tutor'
+    for _ in range(retries):
+        slug = next_free_slug(base_slug, user_id=user.id)
+        if _flush_slug(user, slug):
+            return slug
+    raise RuntimeError(f'Could not allocate a profile slug for {base_slug!r}')
@@ -0,0 +1,196 @@
+"""
+Load test for the public booking funnel.
+
+Simulates parents rushing a popular tutor: each virtual parent loads
+``/book/<slug>``, polls ``/api/slots`` for several dates, then posts
+``/book/<slug>/confirm`` for one of the returned slots. Runs against a real
+gunicorn (gunicorn.conf.py) with a stub SMTP server, on a throwaway SQLite
+file or a PostgreSQL URL you provide:
+
+    python -m benchmarks.booking_funnel --parents 200 --concurrency 32
+    python -m benchmarks.booking_funnel --database postgresql://localhost/tutorhub_load
+
+Reports throughput, per-step tail latency, error rate, how many bookings won
+or lost their slot, and how many overlapping (double-booked) sessions exist
+afterwards. A PostgreSQL database must be empty; it is seeded by datagen.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from benchmarks.datagen import create_seeded_app, next_weekday, tutor_slug
+from benchmarks.server import gunicorn
+from benchmarks.smtp_stub import SMTPStub
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class FunnelStats:
+    """Thread-safe latency and outcome counters."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(int)
+
+    def record(self, step, seconds, ok):
+        with self.lock:
+            self.latencies[step].append(seconds * 1000)
+            self.outcomes['requests'] += 1
+            if not ok:
+                self.outcomes['errors'] += 1
+
+    def count(self, outcome):
+        with self.lock:
+            self.outcomes[outcome] += 1
+
+
+def _request(stats, step, url, data=None):
+    """Return (status, body) and record latency; 3xx counts as a valid response."""
+    started = time.perf_counter()
+    try:
+        with _opener.open(url, data=data, timeout=30) as response:
+            status, body = response.status, response.read()
+    except urllib.error.HTTPError as e:
+        status, body = e.code, b''
+    except Exception:
+        stats.record(step, time.perf_counter() - started, ok=False)
+        return None, b''
+    stats.record(step, time.perf_counter() - started, ok=status < 400)
+    return status, body
+
+
+def run_parent(base_url, tutor_id, slug, dates, duration, parent_id, stats, rng):
+    _request(stats, 'profile', f'{base_url}/book/{slug}')
+
+    offered = []
+    for day in rng.sample(dates, k=min(3, len(dates))):
+        status, body = _request(stats, 'slots', f'{base_url}/api/slots/{tutor_id}/{day}?duration={duration}')
+        if status == 200:
+            offered.extend((day, slot) for slot in json.loads(body)['slots'])
+    if not offered:
+        stats.count('no_slots')
+        return
+
+    day, slot = rng.choice(offered)
+    form = urllib.parse.urlencode({
+        'student_name': f'Load Student {parent_id}',
+        'parent_email': f'load{parent_id}@bench.test',
+        'subject': 'Math',
+        'session_type': 'online',
+        'duration': duration,
+        'date': day,
+        'time': slot,
+    }).encode()
+    status, _ = _request(stats, 'confirm', f'{base_url}/book/{slug}/confirm', data=form)
+    if status == 200:
+        stats.count('booked')
+    elif status == 302:
+        stats.count('slot_taken')
+
+
+def count_double_bookings(app, tutor_id):
+    """Number of non-cancelled sessions that overlap an earlier one for the tutor."""
+    from database.models import Session
+    with app.app_context():
+        rows = Session.query.with_entities(Session.scheduled_at, Session.duration_minutes).filter(
+            Session.user_id == tutor_id,
+            Session.status != 'cancelled',
+        ).order_by(Session.scheduled_at).all()
+    overlaps = 0
+    latest_end = datetime.min
+    for start, minutes in rows:
+        if start < latest_end:
+            overlaps += 1
+        latest_end = max(latest_end, start + timedelta(minutes=minutes))
+    return overlaps
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the public booking funnel.')
+    parser.add_argument('--database', help='PostgreSQL URL (default: throwaway SQLite file)')
+    parser.add_argument('--parents', type=int, default=200, help='virtual parents to run')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--days', type=int, default=5, help='weekdays parents choose from')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--worker-class', default='gthread')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        app, _ = create_seeded_app(database_url, tutors=3, students_per_tutor=10, years=1)
+        from database.models import User
+        slug = tutor_slug(0)
+        with app.app_context():
+            tutor = User.query.filter_by(profile_slug=slug).one()
+            tutor_id, duration = tutor.id, tutor.duration_list()[0]
+        before = count_double_bookings(app, tutor_id)
+
+        dates, day = [], None
+        while len(dates) < args.days:
+            day = next_weekday(day)
+            dates.append(day.isoformat())
+
+        stats = FunnelStats()
+        with SMTPStub() as smtp, gunicorn(
+            database_url, ready_path=f'/book/{slug}',
+            WEB_CONCURRENCY=args.workers, GUNICORN_WORKER_CLASS=args.worker_class,
+            MAIL_SERVER=smtp.host, MAIL_PORT=smtp.port, MAIL_USE_TLS='false',
+            MAIL_USERNAME='load@bench.test', MAIL_PASSWORD='stub',
+        ) as base_url:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                for parent_id in range(args.parents):
+                    rng = random.Random(args.seed * 100_003 + parent_id)
+                    pool.submit(run_parent, base_url, tutor_id, slug, dates, duration,
+                                parent_id, stats, rng)
+            elapsed = time.perf_counter() - started
+            time.sleep(1)  # let the outbox dispatchers drain
+            emails = smtp.messages
+
+        double_booked = count_double_bookings(app, tutor_id) - before
+
+    outcomes = stats.outcomes
+    print(f"parents {args.parents}, concurrency {args.concurrency}, "
+          f"{args.workers}x {args.worker_class} workers, {'PostgreSQL' if args.database else 'SQLite'}")
+    print(f"throughput  {args.parents / elapsed:.1f} funnels/s, {outcomes['requests'] / elapsed:.1f} req/s")
+    print(f"errors      {outcomes['errors']} of {outcomes['requests']} requests "
+          f"({100 * outcomes['errors'] / max(outcomes['requests'], 1):.2f}%)")
+    print(f"bookings    {outcomes['booked']} booked, {outcomes['slot_taken']} slot taken, "
+          f"{outcomes['no_slots']} saw no slots")
+    print(f"emails      {emails} delivered to stub SMTP")
+    print(f"double-booked sessions: {double_booked}")
+    print(f'\n{"step":<10} {"count":>6} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+    for step in ('profile', 'slots', 'confirm'):
+        values = stats.latencies.get(step)
+        if values:
+            print(f'{step:<10} {len(values):>6} {statistics.median(values):>9.1f} '
+                  f'{_percentile(values, 95):>9.1f} {_percentile(values, 99):>9.1f} {max(values):>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+CPU cost versus bytes saved for response compression.
+
+Seeds a throwaway SQLite database, renders the heavy pages once with
+compression off, then compresses each body with every codec and level and
+reports the compressed size, the share of bytes saved and the CPU time per
+response:
+
+    python -m benchmarks.compression --iterations 50
+
+``streamed`` rows compress the same body in 4 KiB chunks with a flush after
+each one, as the middleware does for responses without a Content-Length.
+Brotli rows are skipped unless the ``brotli`` package is installed.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.datagen import create_seeded_app, next_weekday, seeded_client, tutor_email, tutor_slug
+from utils.compression import brotli, compress_body, compressor
+
+CODECS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 6), ('br', 11)]
+STREAM_CHUNK = 4096
+
+
+def fetch_bodies(app):
+    """Return {route: uncompressed body} for the pages worth compressing."""
+    from database.models import Student, User
+    with app.app_context():
+        tutor = User.query.filter_by(email=tutor_email(0)).one()
+        tutor_id, duration = tutor.id, tutor.duration_list()[0]
+        student_id = Student.query.filter_by(user_id=tutor_id).first().id
+
+    client = seeded_client(app)
+    slot_date = next_weekday()
+
+    paths = {
+        'dashboard.index': '/dashboard',
+        'payments.overview': '/payments/',
+        'students.detail': f'/students/{student_id}',
+        'booking.public_profile': f'/book/{tutor_slug(0)}',
+        'booking.api_slots': f'/api/slots/{tutor_id}/{slot_date.isoformat()}?duration={duration}',
+    }
+    bodies = {}
+    for name, path in paths.items():
+        # No Accept-Encoding header, so the middleware passes the body through
+        response = client.get(path)
+        assert response.status_code == 200, f'{path} returned {response.status_code}'
+        bodies[name] = response.data
+    return bodies
+
+
+def compress_streamed(encoding, level, body):
+    codec = compressor(encoding, level)
+    parts = []
+    for start in range(0, len(body), STREAM_CHUNK):
+        parts.append(codec.compress(body[start:start + STREAM_CHUNK]) + codec.flush())
+    parts.append(codec.finish())
+    return b''.join(parts)
+
+
+def measure(fn, encoding, level, body, iterations):
+    """Return (compressed size, median ms per call)."""
+    size = len(fn(encoding, level, body))
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(encoding, level, body)
+        timings.append((time.perf_counter() - started) * 1000)
+    return size, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--iterations', type=int, default=50, help='compressions per codec and route')
+    parser.add_argument('--students', type=int, default=30, help='students per tutor')
+    parser.add_argument('--years', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app, _ = create_seeded_app(database_url, tutors=1, students_per_tutor=args.students, years=args.years)
+        bodies = fetch_bodies(app)
+
+    codecs = [(encoding, level) for encoding, level in CODECS if encoding == 'gzip' or brotli is not None]
+    if brotli is None:
+        print('brotli not installed; gzip only\n')
+    print(f'{"route":<24} {"codec":<18} {"bytes":>9} {"saved":>7} {"ms":>7} {"MB/s":>7}')
+    for name, body in bodies.items():
+        print(f'{name:<24} {"identity":<18} {len(body):>9}')
+        for encoding, level in codecs:
+            for mode, fn in (('', compress_body), (' streamed', compress_streamed)):
+                size, ms = measure(fn, encoding, level, body, args.iterations)
+                saved = 100 * (1 - size / len(body))
+                rate = len(body) / 1e6 / (ms / 1000) if ms else float('inf')
+                print(f'{"":<24} {f"{encoding}-{level}{mode}":<18} {size:>9} {saved:>6.1f}% {ms:>7.3f} {rate:>7.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Seeded synthetic data for benchmarks and load tests.
+
+Creates tutors with students, weekly availability, years of session history
+and invoices at roughly the shape we see in production: most students book
+weekly, ~85% of past sessions are completed, older sessions are mostly paid.
+The same seed always produces the same rows.
+
+    python -m benchmarks.datagen --database sqlite:////tmp/bench.db --tutors 20
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date, datetime, time, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = 'bench-password'
+SUBJECTS = ['Math', 'Physics', 'Chemistry', 'English', 'Spanish', 'Biology', 'SAT Prep', 'Piano']
+FIRST_NAMES = ['Ava', 'Liam', 'Mia', 'Noah', 'Zoe', 'Ethan', 'Lily', 'Omar', 'Sara', 'Leo',
+               'Nina', 'Kai', 'Ivy', 'Sam', 'Ruby', 'Max', 'Aria', 'Eli', 'Maya', 'Jack']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Patel', 'Kim', 'Lopez', 'Brown', 'Nguyen', 'Ali', 'Moore']
+
+
+def tutor_email(index):
+    return f'tutor{index}@bench.test'
+
+
+def tutor_slug(index):
+    return f'bench-tutor-{index}'
+
+
+def next_weekday(day=None):
+    """First Monday-Friday date after ``day`` (default today); bench tutors are available on weekdays."""
+    day = (day or date.today()) + timedelta(days=1)
+    while day.weekday() > 4:
+        day += timedelta(days=1)
+    return day
+
+
+def _past_status(rng):
+    roll = rng.random()
+    if roll < 0.85:
+        return 'completed'
+    if roll < 0.95:
+        return 'cancelled'
+    return 'no_show'
+
+
+def generate(tutors=10, students_per_tutor=25, years=2, seed=42, now=None):
+    """Insert synthetic rows into the current app's database. Returns row counts.
+
+    Must run inside an application context with migrations applied.
+    """
+    from database.db import db
+    from database.models import User, Student, Availability, Session, Invoice
+
+    rng = random.Random(seed)
+    now = (now or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    history_start = now - timedelta(days=365 * years)
+    counts = {'tutors': 0, 'students': 0, 'availabilities': 0, 'sessions': 0, 'invoices': 0}
+
+    # Hash once; every bench tutor shares the password
+    template = User(email='', full_name='')
+    template.set_password(PASSWORD)
+
+    for t in range(tutors):
+        rate = rng.choice([35, 45, 50, 60, 75, 90])
+        tutor = User(
+            email=tutor_email(t),
+            password_hash=template.password_hash,
+            full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            profile_slug=tutor_slug(t),
+            bio='Experienced tutor. ' * rng.randint(3, 12),
+            subjects=', '.join(rng.sample(SUBJECTS, rng.randint(1, 4))),
+            hourly_rate=rate,
+            session_durations=rng.choice(['60', '30,60', '45,60,90']),
+            default_meeting_link=f'https://meet.example.com/{tutor_slug(t)}',
+            onboarding_completed=True,
+            onboarding_step=5,
+            created_at=history_start,
+        )
+        db.session.add(tutor)
+        db.session.flush()
+        counts['tutors'] += 1
+
+        # Weekday availability, sometimes Saturday mornings
+        availability_rows = []
+        for day in range(7):
+            if day < 5 or (day == 5 and rng.random() < 0.4):
+                start_hour = rng.choice([8, 9, 10, 14, 15])
+                availability_rows.append({
+                    'user_id': tutor.id, 'day_of_week': day, 'is_active': True,
+                    'start_time': time(start_hour, 0),
+                    'end_time': time(min(start_hour + rng.randint(3, 8), 21), 0),
+                })
+        db.session.execute(Availability.__table__.insert(), availability_rows)
+        counts['availabilities'] += len(availability_rows)
+
+        session_rows = []
+        invoice_rows = []
+        for s in range(students_per_tutor):
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            student = Student(
+                user_id=tutor.id, name=name,
+                parent_name=f'{rng.choice(FIRST_NAMES)} {name.split()[1]}',
+                parent_email=f'parent{t}-{s}@bench.test',
+                grade_level=str(rng.randint(3, 12)),
+                subject=rng.choice(SUBJECTS),
+                is_active=rng.random() < 0.8,
+            )
+            db.session.add(student)
+            db.session.flush()
+            counts['students'] += 1
+
+            # Each student books on a fixed weekday/hour, most weekly, some biweekly
+            start = history_start + timedelta(days=rng.randint(0, 365 * years - 30))
+            weekday_offset = rng.randint(0, 6)
+            hour = rng.choice([9, 10, 11, 15, 16, 17, 18])
+            interval = timedelta(weeks=1 if rng.random() < 0.7 else 2)
+            stop = now + timedelta(weeks=rng.randint(1, 8)) if student.is_active else \
+                start + timedelta(weeks=rng.randint(4, 40))
+            duration = rng.choice(tutor.duration_list())
+
+            scheduled = (start + timedelta(days=weekday_offset)).replace(hour=hour)
+            unbilled = []
+            while scheduled < stop:
+                past = scheduled < now
+                status = _past_status(rng) if past else 'scheduled'
+                completed = status == 'completed'
+                is_paid = completed and (scheduled < now - timedelta(days=30) or rng.random() < 0.5)
+                session_rows.append({
+                    'user_id': tutor.id,
+                    'student_id': student.id,
+                    'scheduled_at': scheduled,
+                    'duration_minutes': duration,
+                    'session_type': 'online' if rng.random() < 0.7 else 'in_person',
+                    'rate_charged': rate * duration / 60,
+                    'status': status,
+                    'notes': 'Covered homework.' if completed and rng.random() < 0.8 else '',
+                    'progress_rating': rng.randint(2, 5) if completed and rng.random() < 0.7 else None,
+                    'is_paid': is_paid,
+                    'paid_date': scheduled + timedelta(days=rng.randint(1, 20)) if is_paid else None,
+                    'completed_at': scheduled + timedelta(minutes=duration) if completed else None,
+                    'created_at': scheduled - timedelta(days=7),
+                })
+                if completed:
+                    unbilled.append(scheduled)
+                scheduled += interval
+
+            # Monthly invoices for roughly a third of students
+            if rng.random() < 0.35 and unbilled:
+                months = sorted({(d.year, d.month) for d in unbilled})
+                for year, month in months:
+                    invoice_rows.append({
+                        'user_id': tutor.id,
+                        'student_id': student.id,
+                        'invoice_number': f'INV-{year}-{month:02d}-T{t}S{s}',
+                        'session_ids': '',
+                        'total_amount': rate * 4,
+                        'is_paid': (year, month) < (now.year, now.month),
+                        'generated_date': datetime(year, month, 28),
+                    })
+
+        if session_rows:
+            db.session.execute(Session.__table__.insert(), session_rows)
+        if invoice_rows:
+            db.session.execute(Invoice.__table__.insert(), invoice_rows)
+        counts['sessions'] += len(session_rows)
+        counts['invoices'] += len(invoice_rows)
+        db.session.commit()
+
+    return counts
+
+
+def create_seeded_app(database_url, **generate_kwargs):
+    """Build a production-config app on ``database_url``, migrate it and fill it with data.
+
+    The app is built without rate limiting, since benchmark traffic all comes
+    from one client.
+    """
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('RATELIMIT_ENABLED', 'false')
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    from app import create_app
+    from database.migrations import run_migrations
+
+    app = create_app('production')
+    with app.app_context():
+        run_migrations()
+        counts = generate(**generate_kwargs)
+    return app, counts
+
+
+def seeded_client(app, tutor_index=0):
+    """A test client logged in as the seeded tutor ``tutor_index``."""
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': tutor_email(tutor_index), 'password': PASSWORD})
+    assert response.status_code == 302, 'benchmark login failed'
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill a database with synthetic TutorHub data.')
+    parser.add_argument('--database', required=True, help='SQLAlchemy URL, e.g. sqlite:////tmp/bench.db')
+    parser.add_argument('--tutors', type=int, default=10)
+    parser.add_argument('--students', type=int, default=25, help='students per tutor')
+    parser.add_argument('--years', type=int, default=2, help='years of session history')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    _, counts = create_seeded_app(
+        args.database, tutors=args.tutors, students_per_tutor=args.students,
+        years=args.years, seed=args.seed,
+    )
+    print(', '.join(f'{n} {name}' for name, n in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Compare gunicorn worker models against the booking and dashboard routes.
+
+Seeds a throwaway SQLite database, starts gunicorn with gunicorn.conf.py once
+per worker class, and reports requests/sec and latency for each route:
+
+    python -m benchmarks.gunicorn_modes --requests 400 --concurrency 16
+
+gevent is skipped unless it is installed.
+"""
+
+import argparse
+import http.cookiejar
+import importlib.util
+import os
+import statistics
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.datagen import PASSWORD, create_seeded_app, next_weekday, tutor_email, tutor_slug
+from benchmarks.server import gunicorn
+
+MODES = ['sync', 'gthread', 'gevent']
+TUTOR_EMAIL = tutor_email(0)
+TUTOR_PASSWORD = PASSWORD
+TUTOR_SLUG = tutor_slug(0)
+
+
+def seed_database(database_url):
+    """Fill the database with one synthetic tutor; return the tutor's id."""
+    app, _ = create_seeded_app(database_url, tutors=1, students_per_tutor=20, years=1)
+    from database.models import User
+    with app.app_context():
+        return User.query.filter_by(profile_slug=TUTOR_SLUG).one().id
+
+
+def _login(base_url):
+    """Return a Cookie header value for the seeded tutor."""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    form = urllib.parse.urlencode({'email': TUTOR_EMAIL, 'password': TUTOR_PASSWORD}).encode()
+    opener.open(f'{base_url}/auth/login', data=form)
+    return '; '.join(f'{c.name}={c.value}' for c in jar)
+
+
+def _hit(url, cookie):
+    request = urllib.request.Request(url, headers={'Cookie': cookie} if cookie else {})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def run_route(url, cookie, total, concurrency):
+    """Fire `total` GETs with `concurrency` clients; return (rps, p50_ms, p95_ms)."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda _: _hit(url, cookie), range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return total / elapsed, statistics.median(latencies) * 1000, p95 * 1000
+
+
+def bench_mode(mode, database_url, tutor_id, args):
+    with gunicorn(database_url, ready_path=f'/book/{TUTOR_SLUG}',
+                  GUNICORN_WORKER_CLASS=mode, WEB_CONCURRENCY=args.workers) as base_url:
+        cookie = _login(base_url)
+        slot_date = next_weekday().isoformat()
+        routes = [
+            ('booking.public_profile', f'/book/{TUTOR_SLUG}', None),
+            ('booking.api_slots', f'/api/slots/{tutor_id}/{slot_date}?duration=60', None),
+            ('dashboard.index', '/dashboard', cookie),
+        ]
+        for name, path, route_cookie in routes:
+            run_route(base_url + path, route_cookie, args.concurrency, args.concurrency)  # warm up
+            rps, p50, p95 = run_route(base_url + path, route_cookie, args.requests, args.concurrency)
+            print(f'{mode:<8} {name:<24} {rps:>9.1f} {p50:>9.1f} {p95:>9.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=400, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        tutor_id = seed_database(database_url)
+
+        print(f'{"mode":<8} {"route":<24} {"req/s":>9} {"p50 ms":>9} {"p95 ms":>9}')
+        for mode in args.modes:
+            if mode == 'gevent' and importlib.util.find_spec('gevent') is None:
+                print(f'{mode:<8} skipped (gevent not installed)')
+                continue
+            bench_mode(mode, database_url, tutor_id, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Helpers for running the app under a real gunicorn in benchmarks."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from benchmarks.datagen import ROOT
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not start at {url}')
+
+
+@contextmanager
+def gunicorn(database_url, ready_path='/', **env):
+    """Start gunicorn with gunicorn.conf.py on a free port and yield its base URL.
+
+    Extra keyword arguments are passed to the server as environment variables.
+    Rate limiting is off unless ``RATELIMIT_ENABLED`` is passed: every benchmark
+    client shares 127.0.0.1, so the per-client buckets would turn load into 429s.
+    """
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'wsgi:app', '-c', 'gunicorn.conf.py',
+         '--bind', f'127.0.0.1:{port}'],
+        cwd=ROOT,
+        env={**os.environ, 'DATABASE_URL': database_url, 'GUNICORN_LOG_LEVEL': 'warning',
+             'RATELIMIT_ENABLED': 'false', **{key: str(value) for key, value in env.items()}},
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        wait_for(base_url + ready_path)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait()
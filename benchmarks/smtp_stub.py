@@ -0,0 +1,72 @@
+"""
+Minimal in-process SMTP sink for load tests.
+
+Speaks just enough SMTP (EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT) for
+smtplib to deliver to it without TLS. Messages are counted, not stored.
+
+    with SMTPStub() as smtp:
+        env = {'MAIL_SERVER': smtp.host, 'MAIL_PORT': str(smtp.port), 'MAIL_USE_TLS': 'false'}
+"""
+
+import socketserver
+import threading
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        stub = self.server.stub
+        self.reply('220 smtp-stub ready')
+        with stub.lock:
+            stub.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.wfile.write(b'250-smtp-stub\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n')
+            elif command.startswith('AUTH'):
+                self.reply('235 authenticated')
+            elif command.startswith(('MAIL', 'RCPT', 'RSET', 'NOOP')):
+                self.reply('250 ok')
+            elif command == 'DATA':
+                self.reply('354 end with <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                with stub.lock:
+                    stub.messages += 1
+                self.reply('250 queued')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('502 not implemented')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPStub:
+    """Background SMTP sink counting connections and delivered messages."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self.host, self.port = self._server.server_address
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
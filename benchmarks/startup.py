@@ -0,0 +1,119 @@
+"""
+Startup profile: how long a fresh process takes to build the app.
+
+Runs ``create_app`` in new interpreters, so nothing is shared between runs
+but the on-disk caches, and reports the median wall time split into library
+imports (Flask, SQLAlchemy, ...), TutorHub's own imports and ``create_app``
+itself. One extra run under ``python -X importtime`` then lists the imports
+that cost the most:
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --cold-templates     # empty Jinja bytecode cache
+    python -m benchmarks.startup --config development
+
+With ``--cold-templates`` every run gets an empty ``JINJA_BYTECODE_CACHE_DIR``,
+as a new container without a baked cache would.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.datagen import ROOT
+
+LIBRARIES = ['flask', 'sqlalchemy.orm', 'flask_sqlalchemy', 'flask_login', 'jinja2', 'prometheus_client']
+LOCAL_PACKAGES = {
+    'app', 'config', 'wsgi', 'auth', 'booking', 'dashboard', 'database', 'monitoring', 'onboarding',
+    'payments', 'scheduling', 'students', 'utils',
+}
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+for name in {libraries!r}:
+    __import__(name)
+libraries = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app({config!r})
+created = time.perf_counter()
+print(json.dumps({{
+    'libraries': libraries - started, 'app_imports': imported - libraries,
+    'create_app': created - imported, 'total': created - started,
+}}), file=sys.stderr)
+"""
+
+
+def _child_env(database_url, template_cache):
+    return dict(os.environ, DATABASE_URL=database_url, JINJA_BYTECODE_CACHE_DIR=template_cache,
+                PYTHONPATH=ROOT)
+
+
+def time_startup(config, database_url, template_cache):
+    """Build the app once in a new interpreter; return its timings in seconds."""
+    code = CHILD.format(libraries=LIBRARIES, config=config)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                            env=_child_env(database_url, template_cache), check=True)
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def import_profile(config, database_url, template_cache):
+    """Return [(self_us, cumulative_us, depth, module)] from ``python -X importtime``."""
+    code = f'from app import create_app; create_app({config!r})'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True,
+                            env=_child_env(database_url, template_cache), check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--config', default='production', choices=['production', 'development'])
+    parser.add_argument('--cold-templates', action='store_true',
+                        help='start every run with an empty Jinja bytecode cache')
+    parser.add_argument('--top', type=int, default=12, help='imports to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        shared_cache = os.path.join(tmp, 'jinja')
+        # Untimed run: applies migrations (development) and warms the shared caches
+        time_startup(args.config, database_url, shared_cache)
+
+        runs = []
+        for run in range(args.runs):
+            cache = os.path.join(tmp, f'jinja-{run}') if args.cold_templates else shared_cache
+            runs.append(time_startup(args.config, database_url, cache))
+        profile = import_profile(args.config, database_url, shared_cache)
+
+    print(f"{args.config} config, {args.runs} runs, "
+          f"{'cold' if args.cold_templates else 'warm'} template cache (median ms)")
+    for phase in ('libraries', 'app_imports', 'create_app', 'total'):
+        print(f'  {phase:<12} {statistics.median(r[phase] for r in runs) * 1000:>8.1f}')
+
+    print(f'\n{"slowest TutorHub modules (self)":<40} {"self ms":>9} {"cum ms":>9}')
+    local = [row for row in profile if row[3].split('.')[0] in LOCAL_PACKAGES]
+    for self_us, cumulative_us, _, name in sorted(local, reverse=True)[:args.top]:
+        print(f'  {name:<38} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}')
+
+    # Depth 1 is what app.py (and create_app) import directly, libraries included
+    print(f'\n{"slowest direct imports (cumulative)":<40} {"self ms":>9} {"cum ms":>9}')
+    direct = [row for row in profile if row[2] <= 1 and row[3] != 'app']
+    for self_us, cumulative_us, _, name in sorted(direct, key=lambda row: -row[1])[:args.top]:
+        print(f'  {name:<38} {self_us / 1000:>9.1f} {cumulative_us / 1000:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
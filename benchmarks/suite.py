@@ -0,0 +1,169 @@
+"""
+Benchmark suite for the hot routes and the slot engine.
+
+Seeds a throwaway SQLite database with benchmarks.datagen (fixed seed), then
+times each scenario through the Flask test client and reports latency
+percentiles and queries per call:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --baseline bench.json --tolerance 0.25
+
+With ``--baseline`` the run exits non-zero if any scenario's p50 latency or
+query count regressed beyond the tolerance, so it can gate a commit.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import create_seeded_app, next_weekday, seeded_client, tutor_email, tutor_slug
+
+
+class QueryCounter:
+    """Counts statements executed on an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'after_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn, counter, iterations, warmup=3):
+    """Run ``fn`` repeatedly; return latency percentiles (ms) and queries per call."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    queries = []
+    for _ in range(iterations):
+        before = counter.count
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count - before)
+    latencies.sort()
+    return {
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'queries': round(statistics.mean(queries), 1),
+    }
+
+
+def build_scenarios(app, tutor_index=0):
+    """Return {name: callable} for every benchmarked code path."""
+    from database.models import User, Student
+    from scheduling.utils import get_available_slots
+
+    with app.app_context():
+        tutor = User.query.filter_by(email=tutor_email(tutor_index)).one()
+        tutor_id = tutor.id
+        student_id = Student.query.filter_by(user_id=tutor_id).first().id
+        durations = tutor.duration_list()
+
+    client = seeded_client(app, tutor_index)
+    anonymous = app.test_client()
+    slot_date = next_weekday()
+
+    def get(test_client, path):
+        def run():
+            result = test_client.get(path)
+            assert result.status_code == 200, f'{path} returned {result.status_code}'
+        return run
+
+    def slot_engine():
+        with app.app_context():
+            get_available_slots(tutor_id, slot_date, durations[0])
+
+    return {
+        'dashboard.index': get(client, '/dashboard'),
+        'payments.overview': get(client, '/payments/'),
+        'students.detail': get(client, f'/students/{student_id}'),
+        'booking.public_profile': get(anonymous, f'/book/{tutor_slug(tutor_index)}'),
+        'booking.api_slots': get(anonymous, f'/api/slots/{tutor_id}/{slot_date.isoformat()}?duration={durations[0]}'),
+        'scheduling.get_available_slots': slot_engine,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human-readable regressions against ``baseline``."""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {previous['p50_ms']}ms -> {current['p50_ms']}ms")
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TutorHub hot paths.')
+    parser.add_argument('--tutors', type=int, default=5)
+    parser.add_argument('--students', type=int, default=30, help='students per tutor')
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--only', nargs='+', help='run only these scenarios')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed fractional p50 slowdown before failing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app, counts = create_seeded_app(
+            database_url, tutors=args.tutors, students_per_tutor=args.students,
+            years=args.years, seed=args.seed,
+        )
+        from database.db import db
+        with app.app_context():
+            counter = QueryCounter(db.engine)
+
+        scenarios = build_scenarios(app)
+        results = {
+            'dataset': {'seed': args.seed, 'years': args.years, **counts},
+            'iterations': args.iterations,
+            'scenarios': {},
+        }
+        print(f"dataset: {', '.join(f'{n} {k}' for k, n in counts.items())}")
+        print(f'{"scenario":<32} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"queries":>8}')
+        for name, fn in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            stats = measure(fn, counter, args.iterations)
+            results['scenarios'][name] = stats
+            print(f"{name:<32} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                  f"{stats['p99_ms']:>9.2f} {stats['queries']:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print('\nRegressions:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print('\nNo regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Caching for the public booking pages.
+
+Every tutor has a ``User.public_version`` stamp, bumped in the same
+transaction as any change to their public profile, availability or sessions. The
+booking routes derive ETags from it, so a browser's conditional GET is
+answered with a 304 after one indexed lookup.
+
+``fragment_cache`` keeps the rendered profile parts of ``/book/<slug>`` per
+tutor and ``profile_fingerprint``, so bookings don't re-render them.
+``slot_cache`` holds ``/api/slots`` results for ``SLOTS_CACHE_TTL`` seconds,
+keyed by tutor, date and duration. Any committed change to a tutor's
+sessions or availability bumps that tutor's generation, which retires all of
+their cached entries at once (other workers catch up when the TTL runs out;
+``confirm_booking`` always re-checks the primary, so a stale slot can only
+turn into a "no longer available" message).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from jinja2 import meta
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import object_session
+from database.db import db
+from database.models import Availability, Session, User
+from database.routing import RoutingSession
+
+MISSING = object()
+
+
+class SlotCache:
+    """Bounded TTL cache with per-tutor invalidation."""
+
+    def __init__(self, ttl=5, max_entries=10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _key(self, tutor_id, *parts):
+        return (tutor_id, self._generations.get(tutor_id, 0), *parts)
+
+    def get(self, tutor_id, *parts):
+        """Return the cached value, or ``MISSING``."""
+        with self._lock:
+            key = self._key(tutor_id, *parts)
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, tutor_id, *parts, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            key = self._key(tutor_id, *parts)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tutor_id):
+        """Retire every entry for ``tutor_id``; they age out of the LRU."""
+        with self._lock:
+            self._generations[tutor_id] = self._generations.get(tutor_id, 0) + 1
+
+
+slot_cache = SlotCache()
+
+
+class FragmentCache:
+    """LRU of rendered HTML fragments keyed by (tutor id, profile fingerprint).
+
+    The fingerprint is part of the key, so a profile change simply stops
+    hitting the old entry; no invalidation is needed.
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, tutor_id, fingerprint, render):
+        key = (tutor_id, fingerprint)
+        with self._lock:
+            fragments = self._entries.get(key)
+            if fragments is not None:
+                self._entries.move_to_end(key)
+                return fragments
+        fragments = render()  # outside the lock; a rare duplicate render is harmless
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = fragments
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return fragments
+
+
+fragment_cache = FragmentCache()
+
+
+# User columns shown on the public booking page. Other updates (password
+# rehash on login, onboarding progress, phone, address) leave the caches alone.
+PUBLIC_PROFILE_FIELDS = (
+    'full_name', 'bio', 'subjects', 'hourly_rate', 'currency', 'timezone',
+    'session_durations', 'profile_slug',
+)
+
+
+def profile_fingerprint(tutor):
+    """Short hash of ``tutor``'s public profile columns; unlike public_version, bookings don't change it."""
+    values = repr(tuple(getattr(tutor, name) for name in PUBLIC_PROFILE_FIELDS))
+    return hashlib.sha1(values.encode()).hexdigest()[:8]
+
+
+# ── Invalidation hooks ──
+# Changes are collected per session at flush and applied after commit, so a
+# concurrent request can't re-cache the old schedule in between.
+
+def _bump_public_version(connection, tutor_id):
+    connection.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id == tutor_id)
+        .values(public_version=User.__table__.c.public_version + 1)
+    )
+
+
+def note_schedule_change(tutor_id):
+    """
+    Bump ``tutor_id``'s version and invalidate their cache on commit. Needed
+    after bulk ``Query.delete()``/``update()``, which the mapper hooks don't see.
+    """
+    _bump_public_version(db.session.connection(), tutor_id)
+    db.session.info.setdefault('changed_tutor_ids', set()).add(tutor_id)
+
+
+def _record_change(tutor_id, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    # One bump per tutor per flush is enough
+    bumped = session.info.setdefault('bumped_tutor_ids', set())
+    if tutor_id not in bumped:
+        bumped.add(tutor_id)
+        _bump_public_version(connection, tutor_id)
+    session.info.setdefault('changed_tutor_ids', set()).add(tutor_id)
+
+
+def _schedule_changed(mapper, connection, target):
+    _record_change(target.user_id, connection, target)
+
+
+def _profile_changed(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if any(attrs[name].history.has_changes() for name in PUBLIC_PROFILE_FIELDS):
+        _record_change(target.id, connection, target)
+
+
+for _model in (Session, Availability):
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event, _schedule_changed)
+event.listen(User, 'after_update', _profile_changed)
+
+
+@event.listens_for(RoutingSession, 'after_flush_postexec')
+def _reset_flush_bumps(session, flush_context):
+    session.info.pop('bumped_tutor_ids', None)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_on_commit(session):
+    for tutor_id in session.info.pop('changed_tutor_ids', ()):
+        slot_cache.invalidate(tutor_id)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_changes(session):
+    session.info.pop('changed_tutor_ids', None)
+    session.info.pop('bumped_tutor_ids', None)
+
+
+def _fingerprint(environment, name):
+    digest = hashlib.sha1()
+    pending, seen = [name], set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        source = environment.loader.get_source(environment, current)[0]
+        digest.update(source.encode())
+        # Includes, imports and parents with a literal name (dynamic ones are None)
+        pending.extend(sorted(
+            ref for ref in meta.find_referenced_templates(environment.parse(source)) if ref
+        ))
+    return digest.hexdigest()[:8]
+
+
+_cached_fingerprint = lru_cache(maxsize=None)(_fingerprint)
+
+
+def template_fingerprint(environment, name):
+    """Short hash of a template's source and every template it includes or extends.
+
+    A deploy that changes any of them changes the ETags. Cached for the life
+    of the process unless templates auto-reload (development).
+    """
+    if environment.auto_reload:
+        return _fingerprint(environment, name)
+    return _cached_fingerprint(environment, name)
+
+
+def init_app(app):
+    slot_cache.ttl = app.config.get('SLOTS_CACHE_TTL', 5)
+    fragment_cache.max_entries = app.config.get('PROFILE_FRAGMENT_CACHE_SIZE', 1000)
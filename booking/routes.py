@@ -1,24 +1,91 @@
 from datetime import datetime, date, timedelta
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import (
+    Blueprint, abort, current_app, render_template, redirect, url_for, flash, request, jsonify,
+    make_response,
+)
 from database.db import db
 from database.models import User, Session, Student
+from database.routing import use_primary
+from markupsafe import Markup
+from booking.cache import MISSING, fragment_cache, profile_fingerprint, slot_cache, template_fingerprint
 from scheduling.utils import get_available_slots
-from utils.email_service import send_booking_confirmation_async
+from utils.assets import asset_version
+from utils.email_service import queue_booking_confirmation
+from utils.outbox import notify_dispatcher
+from utils.ratelimit import limiter
 
 booking_bp = Blueprint('booking', __name__)
 
+# Browsers may keep these responses but must revalidate them (cheaply, via ETag)
+REVALIDATE = 'public, no-cache'
+
+
+def _with_etag(response, etag):
+    response = make_response(response)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = REVALIDATE
+    return response
+
+
+def _not_modified(etag):
+    """A 304 if the client's If-None-Match still matches ``etag``, else None."""
+    if request.if_none_match.contains_weak(etag):
+        return _with_etag(('', 304), etag)
+    return None
+
+
+@booking_bp.before_request
+def throttle_public_booking():
+    """Per-client token buckets; confirmations get a much smaller one."""
+    if request.method == 'POST':
+        bucket, limit = 'booking-confirm', current_app.config['BOOKING_CONFIRM_LIMIT']
+    else:
+        bucket, limit = 'booking-read', current_app.config['BOOKING_READ_LIMIT']
+    allowed, retry_after = limiter.hit(f'{bucket}:{request.remote_addr}', *limit)
+    if allowed:
+        return None
+    headers = {'Retry-After': str(retry_after)}
+    if request.endpoint == 'booking.api_slots':
+        return jsonify({'error': 'Too many requests'}), 429, headers
+    return 'Too many requests. Please wait a moment and try again.', 429, headers
+
 
 @booking_bp.route('/book/<slug>')
 def public_profile(slug):
     tutor = User.query.filter_by(profile_slug=slug, is_active=True).first_or_404()
     today = date.today()
+    etag = '-'.join(str(part) for part in (
+        'profile', tutor.id, tutor.public_version, today.isoformat(), asset_version(),
+        template_fingerprint(current_app.jinja_env, 'booking/public.html'),
+        template_fingerprint(current_app.jinja_env, 'booking/_profile_fragments.html'),
+    ))
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    fragments = fragment_cache.get_or_render(
+        tutor.id, profile_fingerprint(tutor), lambda: _render_profile_fragments(tutor),
+    )
     # Show next 21 days
     dates = [today + timedelta(days=i) for i in range(21)]
-    return render_template('booking/public.html',
+    return _with_etag(render_template('booking/public.html',
         tutor=tutor,
         dates=dates,
-        durations=tutor.duration_list(),
-    )
+        fragments=fragments,
+    ), etag)
+
+
+def _render_profile_fragments(tutor):
+    """Render the profile-only parts of the booking page (see _profile_fragments.html)."""
+    module = current_app.jinja_env.get_template('booking/_profile_fragments.html').make_module({
+        'tutor': tutor,
+        'subjects': tutor.subject_list(),
+        'durations': tutor.duration_list(),
+    })
+    return {
+        name: Markup(getattr(module, name)).strip()
+        for name in ('header', 'sidebar', 'subject_options', 'duration_options')
+    }
 
 
 @booking_bp.route('/api/slots/<int:tutor_id>/<date_str>')
@@ -30,15 +97,40 @@ def api_slots(tutor_id, date_str):
         return jsonify({'error': 'Invalid date'}), 400
 
     duration = request.args.get('duration', 60, type=int)
-    tutor = User.query.get_or_404(tutor_id)
+    if not 0 < duration <= 24 * 60:
+        return jsonify({'error': 'Invalid duration'}), 400
 
-    slots = get_available_slots(tutor_id, target_date, duration)
+    today = date.today()
 
-    return jsonify({
+    def slots_etag(version):
+        return f'slots-{tutor_id}-{version}-{date_str}-{duration}-{today.isoformat()}'
+
+    # Identical requests within SLOTS_CACHE_TTL skip the database entirely
+    cached = slot_cache.get(tutor_id, target_date, duration)
+    if cached is MISSING:
+        version = db.session.query(User.public_version).filter_by(id=tutor_id).scalar()
+        if version is None:
+            slot_cache.put(tutor_id, target_date, duration, value=None)
+            abort(404)
+        not_modified = _not_modified(slots_etag(version))
+        if not_modified:
+            return not_modified
+        if today <= target_date <= today + timedelta(days=current_app.config['SLOTS_MAX_DAYS_AHEAD']):
+            slots = [s.strftime('%H:%M') for s in get_available_slots(tutor_id, target_date, duration)]
+        else:
+            slots = []
+        cached = (version, slots)
+        slot_cache.put(tutor_id, target_date, duration, value=cached)
+    if cached is None:
+        abort(404)
+
+    version, slots = cached
+    etag = slots_etag(version)
+    return _not_modified(etag) or _with_etag(jsonify({
         'date': date_str,
         'duration': duration,
-        'slots': [s.strftime('%H:%M') for s in slots],
-    })
+        'slots': slots,
+    }), etag)
 
 
 @booking_bp.route('/book/<slug>/confirm', methods=['POST'])
@@ -64,9 +156,10 @@ def confirm_booking(slug):
         flash('Invalid date or time selected.', 'error')
         return redirect(url_for('booking.public_profile', slug=slug))
 
-    # Check if slot is still available
+    # Check if slot is still available (never trust replica lag here)
     target_date = scheduled_at.date()
-    available = get_available_slots(tutor.id, target_date, duration)
+    with use_primary():
+        available = get_available_slots(tutor.id, target_date, duration)
     slot_times = [s.strftime('%H:%M') for s in available]
     if time_str not in slot_times:
         flash('Sorry, that time slot is no longer available. Please pick another.', 'error')
@@ -99,11 +192,12 @@ def confirm_booking(slug):
         meeting_link=meeting_link,
     )
     db.session.add(session)
-    db.session.commit()
+    db.session.flush()
 
-    # Send email notifications (non-blocking)
+    # Stage email notifications in the same transaction as the booking
     if parent_email:
-        send_booking_confirmation_async(
+        queue_booking_confirmation(
+            session_id=session.id,
             tutor_email=tutor.email,
             tutor_name=tutor.full_name,
             student_name=student_name,
@@ -114,6 +208,9 @@ def confirm_booking(slug):
             subject=subject,
             meeting_link=meeting_link if session_type == 'online' else None,
         )
+    db.session.commit()
+    if parent_email:
+        notify_dispatcher()
 
     return render_template('booking/confirmation.html',
         tutor=tutor,
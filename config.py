@@ -2,19 +2,166 @@ import os
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+
+def _env_int(name, default):
+    value = os.getenv(name, '')
+    return int(value) if value.strip() else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name, '')
+    return value.lower() in ('1', 'true', 'yes') if value.strip() else default
+
+
+def engine_options(database_uri):
+    """SQLAlchemy engine options for the given database, tunable through env vars."""
+    options = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+    }
+    if database_uri.startswith('sqlite'):
+        # The driver-level timeout is how long a writer waits on a locked database
+        options['connect_args'] = {'timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000}
+        return options
+
+    options.update({
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+    })
+    if database_uri.startswith('postgresql'):
+        statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS', 15000)
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-prod')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Apply pending migrations inside create_app (dev only; prod runs `flask migrate`)
+    AUTO_MIGRATE = _env_bool('AUTO_MIGRATE', False)
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', f'sqlite:///{os.path.join(basedir, "tutorhub.db")}')
     # Fix for Render PostgreSQL URLs (postgres:// â postgresql://)
     if SQLALCHEMY_DATABASE_URI and SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # Optional read replica for anonymous public traffic (see database/routing.py)
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URL', '')
+    if SQLALCHEMY_REPLICA_URI.startswith('postgres://'):
+        SQLALCHEMY_REPLICA_URI = SQLALCHEMY_REPLICA_URI.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_BINDS = {
+        'replica': {'url': SQLALCHEMY_REPLICA_URI, **engine_options(SQLALCHEMY_REPLICA_URI)},
+    } if SQLALCHEMY_REPLICA_URI else {}
+    # Endpoints or blueprints whose GET requests may read from the replica
+    DB_REPLICA_ROUTES = ['booking.public_profile', 'booking.api_slots']
+
+    # Per-request SQL stats: 'headers', 'log' or 'off' (see monitoring/sql.py)
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'off')
+    SQL_N_PLUS_ONE_THRESHOLD = _env_int('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    SQL_SLOWEST_STATEMENTS = 3
+
+    # Prometheus /metrics endpoint; set METRICS_TOKEN to require a bearer token.
+    # Outside debug mode the app refuses to start with metrics on and no token.
+    METRICS_ENABLED = _env_bool('METRICS_ENABLED', True)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+    # On-demand request profiling (see monitoring/profiling.py); off without a secret
+    PROFILING_SECRET = os.getenv('PROFILING_SECRET', '')
+    PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(basedir, 'profiles'))
+    PROFILING_RATE_LIMIT = _env_int('PROFILING_RATE_LIMIT', 10)   # profiles per window per worker
+    PROFILING_RATE_WINDOW = _env_int('PROFILING_RATE_WINDOW', 3600)
+
+    # Login throttling: (burst, tokens per minute) buckets checked before any
+    # password hashing. Set RATELIMIT_REDIS_URL to share buckets across workers.
+    RATELIMIT_ENABLED = _env_bool('RATELIMIT_ENABLED', True)
+    RATELIMIT_REDIS_URL = os.getenv('RATELIMIT_REDIS_URL', '')
+    LOGIN_IP_LIMIT = (_env_int('LOGIN_IP_BURST', 20), _env_int('LOGIN_IP_PER_MINUTE', 10))
+    LOGIN_EMAIL_LIMIT = (_env_int('LOGIN_EMAIL_BURST', 5), _env_int('LOGIN_EMAIL_PER_MINUTE', 2))
+    # Per-client limits on the public booking pages and slots API
+    BOOKING_READ_LIMIT = (_env_int('BOOKING_READ_BURST', 60), _env_int('BOOKING_READ_PER_MINUTE', 120))
+    BOOKING_CONFIRM_LIMIT = (_env_int('BOOKING_CONFIRM_BURST', 10), _env_int('BOOKING_CONFIRM_PER_MINUTE', 5))
+    # Proxies in front of the app whose X-Forwarded-For is trusted for client IPs.
+    # Without it every request behind a load balancer shares the proxy's
+    # address and the per-IP buckets above become global caps (render.yaml sets 1)
+    TRUSTED_PROXIES = _env_int('TRUSTED_PROXIES', 0)
+
+    # Password hashing (see utils/passwords.py); older hashes upgrade on login
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_CONCURRENCY = _env_int('PASSWORD_HASH_CONCURRENCY', 2)  # per process
+    PASSWORD_HASH_WAIT = _env_int('PASSWORD_HASH_WAIT', 10)               # seconds
+
+    # Seconds /api/slots responses are reused (0 disables); bookings invalidate early
+    SLOTS_CACHE_TTL = _env_int('SLOTS_CACHE_TTL', 5)
+    SLOTS_MAX_DAYS_AHEAD = _env_int('SLOTS_MAX_DAYS_AHEAD', 120)
+    # Rendered tutor profiles kept per worker (LRU; 0 disables)
+    PROFILE_FRAGMENT_CACHE_SIZE = _env_int('PROFILE_FRAGMENT_CACHE_SIZE', 1000)
+
+    # Response compression (see utils/compression.py); brotli needs `pip install brotli`
+    COMPRESS_ENABLED = _env_bool('COMPRESS_ENABLED', True)
+    COMPRESS_MIN_SIZE = _env_int('COMPRESS_MIN_SIZE', 1024)        # bytes
+    COMPRESS_GZIP_LEVEL = _env_int('COMPRESS_GZIP_LEVEL', 6)
+    COMPRESS_BROTLI_QUALITY = _env_int('COMPRESS_BROTLI_QUALITY', 4)
+    COMPRESS_MIMETYPES = [
+        'text/html', 'text/plain', 'text/csv', 'text/css', 'text/javascript',
+        'application/json', 'application/javascript', 'image/svg+xml',
+    ]
+    # Per endpoint or blueprint: False, or overrides of min_size / gzip_level / brotli_quality
+    COMPRESS_ROUTES = {}
+
+    # Compiled templates kept on disk across restarts (see utils/templating.py);
+    # JINJA_PRECOMPILE compiles them all in create_app, before gunicorn forks
+    JINJA_BYTECODE_CACHE = _env_bool('JINJA_BYTECODE_CACHE', True)
+    JINJA_BYTECODE_CACHE_DIR = os.getenv('JINJA_BYTECODE_CACHE_DIR', '')  # default: per-user temp dir
+    JINJA_PRECOMPILE = _env_bool('JINJA_PRECOMPILE', False)
+
+    # Seconds the login user loader may reuse a cached User (0 disables)
+    USER_CACHE_TTL = _env_int('USER_CACHE_TTL', 10)
+
+    # Email outbox (see utils/outbox.py). Disable in-process dispatch when a
+    # separate `flask outbox dispatch` process is running.
+    OUTBOX_DISPATCH_IN_PROCESS = _env_bool('OUTBOX_DISPATCH_IN_PROCESS', True)
+    OUTBOX_WORKERS = _env_int('OUTBOX_WORKERS', 1)
+    OUTBOX_BATCH_SIZE = _env_int('OUTBOX_BATCH_SIZE', 50)
+    OUTBOX_MAX_ATTEMPTS = _env_int('OUTBOX_MAX_ATTEMPTS', 8)
+    OUTBOX_BACKOFF_BASE = _env_int('OUTBOX_BACKOFF_BASE', 30)      # seconds, doubled per attempt
+    OUTBOX_POLL_INTERVAL = _env_int('OUTBOX_POLL_INTERVAL', 5)
+    OUTBOX_IDLE_TIMEOUT = _env_int('OUTBOX_IDLE_TIMEOUT', 60)      # close idle SMTP sessions
+
+    # Session reminders (flask reminders run)
+    REMINDER_INTERVAL = _env_int('REMINDER_INTERVAL', 60)          # seconds between scans
+    REMINDER_CHUNK_SIZE = _env_int('REMINDER_CHUNK_SIZE', 500)
+
+    # Session archival (flask archive run, see utils/archive.py); minimum 62 days
+    SESSIONS_ARCHIVE_AFTER_DAYS = _env_int('SESSIONS_ARCHIVE_AFTER_DAYS', 365)
+    SESSIONS_ARCHIVE_BATCH_SIZE = _env_int('SESSIONS_ARCHIVE_BATCH_SIZE', 1000)
+
+    # Background jobs (flask jobs work, see utils/jobs.py)
+    JOBS_POLL_INTERVAL = _env_int('JOBS_POLL_INTERVAL', 2)
+    JOBS_BACKOFF_BASE = _env_int('JOBS_BACKOFF_BASE', 30)          # seconds, doubled per attempt
+    # Jobs every worker queues periodically: {name: seconds between runs}
+    JOBS_SCHEDULE = {
+        'outbox.purge': 24 * 3600,
+        'jobs.purge': 24 * 3600,
+        'sessions.archive': 24 * 3600,
+    }
+
+    # Applied on every new SQLite connection (ignored for other databases)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': _env_int('SQLITE_MMAP_SIZE', 64 * 1024 * 1024),
+    }
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    AUTO_MIGRATE = True
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'headers')
 
 class ProductionConfig(Config):
     DEBUG = False
+    METRICS_ENABLED = _env_bool('METRICS_ENABLED', bool(Config.METRICS_TOKEN))
+    JINJA_PRECOMPILE = _env_bool('JINJA_PRECOMPILE', True)
 
 config = {
     'development': DevelopmentConfig,
@@ -4,6 +4,7 @@ from flask_login import login_required, current_user
 from sqlalchemy import func, and_
 from database.models import Session, Student
 from database.db import db
+from utils.archive import NO_ARCHIVE, archived_student_stats
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -109,6 +110,8 @@ def index():
 
     # (c) Inactive students (active students whose last session was >21 days ago)
     active_students = Student.query.filter_by(user_id=current_user.id, is_active=True).all()
+    # Older history lives in sessions_archive; one grouped query covers every student
+    archived = archived_student_stats(current_user.id)
     inactive_students = []
     cutoff = now - timedelta(days=21)
     for student in active_students:
@@ -117,10 +120,11 @@ def index():
             Session.student_id == student.id,
             Session.status != 'cancelled',
         ).order_by(Session.scheduled_at.desc()).first()
-        if last_session and last_session.scheduled_at < cutoff:
-            weeks_ago = (now - last_session.scheduled_at).days // 7
+        last_at = last_session.scheduled_at if last_session else archived.get(student.id, NO_ARCHIVE).last_scheduled_at
+        if last_at and last_at < cutoff:
+            weeks_ago = (now - last_at).days // 7
             inactive_students.append({'student': student, 'weeks_ago': weeks_ago})
-        elif not last_session:
+        elif not last_at:
             # Student exists but has never had a session
             inactive_students.append({'student': student, 'weeks_ago': None})
 
@@ -164,13 +168,14 @@ def index():
             Session.status == 'completed',
         ).order_by(Session.scheduled_at.desc()).all()
 
-        total_count = len(completed)
+        history = archived.get(student.id, NO_ARCHIVE)
+        total_count = len(completed) + history.count
         rated = [s for s in completed if s.progress_rating is not None]
 
         avg_rating = None
         trend = 'neutral'  # up, down, neutral
-        if rated:
-            avg_rating = sum(s.progress_rating for s in rated) / len(rated)
+        if rated or history.rated:
+            avg_rating = (sum(s.progress_rating for s in rated) + history.rating_total) / (len(rated) + history.rated)
             # Trend: compare last 3 vs prior 3
             if len(rated) >= 4:
                 recent_3 = sum(s.progress_rating for s in rated[:3]) / 3
@@ -0,0 +1,30 @@
+"""
+Per-connection engine setup.
+
+Pool sizing, pre-ping and the PostgreSQL statement timeout come from
+``SQLALCHEMY_ENGINE_OPTIONS`` (see config.engine_options). SQLite needs its
+pragmas set on every new connection, which is what this module wires up.
+"""
+
+from sqlalchemy import event
+from database.db import db
+
+
+def _apply_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def init_app(app):
+    """Attach connect-time hooks to every engine of the app."""
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite' and pragmas:
+                event.listen(engine, 'connect', _apply_sqlite_pragmas(pragmas))
@@ -0,0 +1,211 @@
+"""
+Versioned schema migrations for TutorHub.
+
+Each migration runs once, in order, and is recorded in the ``schema_version``
+table. The runner holds a lock while it works (a PostgreSQL advisory lock, or
+a lock file for SQLite) so concurrent deploys never race on DDL.
+
+Run it as a separate step before starting workers:
+
+    flask --app wsgi migrate
+"""
+
+import fcntl
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+import click
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text,
+)
+from database.db import db
+
+# Arbitrary but stable key for pg_advisory_lock
+ADVISORY_LOCK_KEY = 727_001
+
+version_metadata = MetaData()
+
+schema_version = Table(
+    'schema_version', version_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+# ── Migrations ──
+# Each entry is (version, description, fn(conn)). Never edit or reorder an
+# applied migration; append a new one instead.
+
+def _create_baseline_tables(conn):
+    """Create the original tables and back-fill columns added before versioning."""
+    from database.models import User, Student, Availability, Session, Invoice
+    for model in (User, Student, Availability, Session, Invoice):
+        model.__table__.create(conn, checkfirst=True)
+
+    # Databases created before versioned migrations may lack these columns
+    inspector = inspect(conn)
+    user_columns = [col['name'] for col in inspector.get_columns('users')]
+    session_columns = [col['name'] for col in inspector.get_columns('sessions')]
+
+    if 'default_meeting_link' not in user_columns:
+        conn.execute(text(
+            "ALTER TABLE users ADD COLUMN default_meeting_link VARCHAR(500) DEFAULT ''"
+        ))
+    if 'meeting_link' not in session_columns:
+        conn.execute(text(
+            "ALTER TABLE sessions ADD COLUMN meeting_link VARCHAR(500) DEFAULT ''"
+        ))
+    if 'onboarding_step' not in user_columns:
+        conn.execute(text(
+            "ALTER TABLE users ADD COLUMN onboarding_step INTEGER DEFAULT 1"
+        ))
+    if 'onboarding_completed' not in user_columns:
+        conn.execute(text(
+            "ALTER TABLE users ADD COLUMN onboarding_completed BOOLEAN DEFAULT FALSE"
+        ))
+
+
+def _add_session_lookup_indexes(conn):
+    """Composite indexes for the per-tutor and per-student session queries."""
+    from database.models import Session
+    for index in Session.__table__.indexes:
+        if index.name in ('ix_sessions_user_scheduled', 'ix_sessions_student_status'):
+            index.create(conn, checkfirst=True)
+
+
+def _create_outbox(conn):
+    from database.models import OutboxMessage
+    OutboxMessage.__table__.create(conn, checkfirst=True)
+
+
+def _add_outbox_text_body(conn):
+    """Plain-text alternative for outbox emails."""
+    columns = [col['name'] for col in inspect(conn).get_columns('outbox')]
+    if 'text_body' not in columns:
+        conn.execute(text("ALTER TABLE outbox ADD COLUMN text_body TEXT DEFAULT ''"))
+
+
+def _add_session_reminder_stage(conn):
+    """Per-session reminder state and the index the reminder scan uses."""
+    from database.models import Session
+    columns = [col['name'] for col in inspect(conn).get_columns('sessions')]
+    if 'reminder_stage' not in columns:
+        conn.execute(text(
+            "ALTER TABLE sessions ADD COLUMN reminder_stage INTEGER NOT NULL DEFAULT 0"
+        ))
+    for index in Session.__table__.indexes:
+        if index.name == 'ix_sessions_reminder_due':
+            index.create(conn, checkfirst=True)
+
+
+def _create_jobs(conn):
+    from database.models import Job
+    Job.__table__.create(conn, checkfirst=True)
+
+
+def _add_user_public_version(conn):
+    """Version stamp behind the public booking page's ETags."""
+    columns = [col['name'] for col in inspect(conn).get_columns('users')]
+    if 'public_version' not in columns:
+        conn.execute(text(
+            "ALTER TABLE users ADD COLUMN public_version INTEGER NOT NULL DEFAULT 1"
+        ))
+
+
+def _create_sessions_archive(conn):
+    """Archive table for old sessions; range-partitioned on PostgreSQL (see utils/archive.py)."""
+    from database.models import ArchivedSession
+    ArchivedSession.__table__.create(conn, checkfirst=True)
+
+
+MIGRATIONS = [
+    (1, 'Baseline tables and legacy column back-fill', _create_baseline_tables),
+    (2, 'Composite indexes on sessions', _add_session_lookup_indexes),
+    (3, 'Email outbox table', _create_outbox),
+    (4, 'Plain-text body on outbox emails', _add_outbox_text_body),
+    (5, 'Session reminder state', _add_session_reminder_stage),
+    (6, 'Background job table', _create_jobs),
+    (7, 'Public version stamp on users', _add_user_public_version),
+    (8, 'Session archive table', _create_sessions_archive),
+]
+
+
+# ── Runner ──
+
+@contextmanager
+def _migration_lock(engine):
+    """Hold an exclusive, cross-process lock for the duration of a migration run."""
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conn:
+            conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+                conn.commit()
+    else:
+        database = os.path.abspath(engine.url.database or 'memory')
+        digest = hashlib.sha1(database.encode()).hexdigest()[:12]
+        lock_path = os.path.join(tempfile.gettempdir(), f'tutorhub-migrate-{digest}.lock')
+        with open(lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def current_version(conn):
+    """Return the highest applied migration version (0 for a fresh database)."""
+    schema_version.create(conn, checkfirst=True)
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def run_migrations(engine=None):
+    """Apply all pending migrations. Returns the list of versions applied."""
+    engine = engine or db.engine
+    applied = []
+    with _migration_lock(engine):
+        with engine.begin() as conn:
+            version = current_version(conn)
+
+        for number, description, migrate in MIGRATIONS:
+            if number <= version:
+                continue
+            # One transaction per migration so a failure leaves a clean version
+            with engine.begin() as conn:
+                migrate(conn)
+                conn.execute(schema_version.insert().values(
+                    version=number,
+                    description=description,
+                    applied_at=datetime.utcnow(),
+                ))
+            print(f'Migration {number}: {description}')
+            applied.append(number)
+    return applied
+
+
+def init_app(app):
+    """Register the ``flask migrate`` CLI command."""
+
+    @app.cli.command('migrate')
+    @click.option('--status', is_flag=True, help='Show the current schema version and exit.')
+    @click.option('--bind', default=None,
+                  help='Migrate a configured bind instead of the primary (e.g. a local replica file).')
+    def migrate_command(status, bind):
+        """Apply pending database migrations."""
+        engine = db.engines[bind]
+        if status:
+            with engine.begin() as conn:
+                version = current_version(conn)
+            latest = MIGRATIONS[-1][0]
+            click.echo(f'Schema version {version} (latest {latest})')
+            return
+
+        applied = run_migrations(engine)
+        if not applied:
+            click.echo('Database is up to date.')
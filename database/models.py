@@ -1,7 +1,7 @@
 from datetime import datetime, time
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from database.db import db
+from utils.passwords import hasher
 
 
 class User(UserMixin, db.Model):
@@ -25,6 +25,7 @@ class User(UserMixin, db.Model):
     is_active = db.Column(db.Boolean, default=True)
     onboarding_step = db.Column(db.Integer, default=1)
     onboarding_completed = db.Column(db.Boolean, default=False)
+    public_version = db.Column(db.Integer, default=1, nullable=False)  # bumped when the booking page/slots change
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -33,10 +34,10 @@ class User(UserMixin, db.Model):
     sessions = db.relationship('Session', backref='tutor', lazy='dynamic')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return hasher.verify(self.password_hash, password)
 
     def subject_list(self):
         return [s.strip() for s in self.subjects.split(',') if s.strip()]
@@ -79,6 +80,11 @@ class Availability(db.Model):
 class Session(db.Model):
     """A tutoring session."""
     __tablename__ = 'sessions'
+    __table_args__ = (
+        db.Index('ix_sessions_user_scheduled', 'user_id', 'scheduled_at'),
+        db.Index('ix_sessions_student_status', 'student_id', 'status'),
+        db.Index('ix_sessions_reminder_due', 'status', 'reminder_stage', 'scheduled_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
@@ -97,6 +103,7 @@ class Session(db.Model):
     rate_charged = db.Column(db.Float, default=0.0)
 
     status = db.Column(db.String(20), default='scheduled')  # scheduled/completed/cancelled/no_show
+    reminder_stage = db.Column(db.Integer, default=0, nullable=False)  # 0 none, 1 day-before sent, 2 hour-before sent
     notes = db.Column(db.Text, default='')
     homework = db.Column(db.Text, default='')
     progress_rating = db.Column(db.Integer, nullable=True)   # 1-5
@@ -118,6 +125,45 @@ class Session(db.Model):
         return self.guest_parent_email
 
 
+def _archive_columns():
+    """Copies of the ``sessions`` columns, keyed on (id, scheduled_at), without single-column indexes."""
+    columns = []
+    for original in Session.__table__.columns:
+        column = original._copy()
+        for foreign_key in original.foreign_keys:
+            column.append_foreign_key(db.ForeignKey(foreign_key.target_fullname))
+        column.index = None
+        if column.name == 'scheduled_at':
+            column.primary_key = True
+        columns.append(column)
+    return columns
+
+
+class ArchivedSession(db.Model):
+    """A completed, paid session moved out of ``sessions`` (see utils/archive.py).
+
+    Rows keep their original ids, so invoices still find them. On PostgreSQL
+    the table is partitioned by ``scheduled_at`` (one partition per year),
+    which is why the primary key includes it.
+    """
+    __table__ = db.Table(
+        'sessions_archive',
+        *_archive_columns(),
+        db.Column('archived_at', db.DateTime, nullable=False, default=datetime.utcnow),
+        db.Index('ix_sessions_archive_student_scheduled', 'student_id', 'scheduled_at'),
+        # Covers the dashboard's per-student counts (utils.archive.archived_student_stats)
+        db.Index('ix_sessions_archive_user_student', 'user_id', 'student_id', 'scheduled_at', 'progress_rating'),
+        postgresql_partition_by='RANGE (scheduled_at)',
+    )
+    __mapper_args__ = {'primary_key': [__table__.c.id]}
+
+    tutor = db.relationship('User', viewonly=True)
+    student = db.relationship('Student', viewonly=True)
+
+    student_display_name = Session.student_display_name
+    contact_email = Session.contact_email
+
+
 class Invoice(db.Model):
     __tablename__ = 'invoices'
 
@@ -131,3 +177,51 @@ class Invoice(db.Model):
     generated_date = db.Column(db.DateTime, default=datetime.utcnow)
     due_date = db.Column(db.DateTime, nullable=True)
     notes = db.Column(db.Text, default='')
+
+
+class OutboxMessage(db.Model):
+    """An email waiting to be delivered by the outbox dispatcher."""
+    __tablename__ = 'outbox'
+    __table_args__ = (
+        db.Index('ix_outbox_due', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    dedupe_key = db.Column(db.String(120), unique=True, nullable=False)
+    to_email = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(250), nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    text_body = db.Column(db.Text, default='')
+
+    status = db.Column(db.String(20), default='pending')  # pending/sent/dead
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claimed_by = db.Column(db.String(36), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, default='')
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+
+class Job(db.Model):
+    """A unit of background work run by ``flask jobs work`` (see utils/jobs.py)."""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_due', 'status', 'priority', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), nullable=False)
+    payload = db.Column(db.Text, default='{}')           # JSON keyword arguments
+    priority = db.Column(db.Integer, default=0, nullable=False)  # lower runs first
+
+    status = db.Column(db.String(20), default='queued')  # queued/done/dead
+    attempts = db.Column(db.Integer, default=0)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claimed_by = db.Column(db.String(36), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, default='')
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
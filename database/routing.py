@@ -0,0 +1,72 @@
+"""
+Read-replica routing for high-volume public reads.
+
+When ``DATABASE_REPLICA_URL`` is set, GET/HEAD requests to the endpoints or
+blueprints listed in ``DB_REPLICA_ROUTES`` read from the replica. Anything
+that writes pins the rest of the request to the primary, so a request always
+reads its own writes. Use ``use_primary()`` around reads that must be fresh.
+"""
+
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND_KEY = 'replica'
+
+
+def _reads_from_replica():
+    return (
+        has_request_context()
+        and g.get('db_replica_reads', False)
+        and not g.get('db_primary_pinned', False)
+    )
+
+
+def pin_primary():
+    """Send every remaining query in this request to the primary."""
+    if has_request_context():
+        g.db_primary_pinned = True
+
+
+@contextmanager
+def use_primary():
+    """Force queries inside the block to the primary database."""
+    if not has_request_context():
+        yield
+        return
+    previous = g.get('db_primary_pinned', False)
+    g.db_primary_pinned = True
+    try:
+        yield
+    finally:
+        g.db_primary_pinned = previous
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica engine when the request allows it."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _reads_from_replica():
+            replica = self._db.engines.get(REPLICA_BIND_KEY)
+            if replica is not None:
+                if self._flushing or isinstance(clause, UpdateBase):
+                    # Writes go to the primary, and so does everything after them
+                    pin_primary()
+                else:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_app(app):
+    """Mark designated read-only routes as replica-eligible."""
+    routes = set(app.config.get('DB_REPLICA_ROUTES') or ())
+    if not app.config.get('SQLALCHEMY_BINDS', {}).get(REPLICA_BIND_KEY) or not routes:
+        return
+
+    @app.before_request
+    def route_reads_to_replica():
+        if request.method in ('GET', 'HEAD') and (
+            request.endpoint in routes or request.blueprint in routes
+        ):
+            g.db_replica_reads = True
@@ -0,0 +1,90 @@
+"""
+Production gunicorn profile for TutorHub.
+
+Every setting can be overridden through environment variables, so the same
+file serves Render, Docker and local benchmarking:
+
+    GUNICORN_WORKER_CLASS   sync | gthread | gevent   (default: gthread)
+    WEB_CONCURRENCY         worker processes          (default: 2 * CPUs + 1)
+    GUNICORN_THREADS        threads per gthread worker (default: 4)
+    GUNICORN_WORKER_CONNECTIONS  greenlets per gevent worker (default: 200)
+    GUNICORN_MAX_REQUESTS   recycle a worker after N requests (default: 1000)
+    GUNICORN_TIMEOUT        hard worker timeout in seconds (default: 30)
+    GUNICORN_KEEPALIVE      keep-alive seconds behind the proxy (default: 5)
+
+See benchmarks/gunicorn_modes.py for a requests/sec comparison of the modes.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+
+
+def _env_int(name, default):
+    value = os.getenv(name, '')
+    return int(value) if value.strip() else default
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+
+# ── Worker model ──
+# gthread keeps a slow SMTP call or dashboard render from blocking the
+# whole worker; gevent needs `pip install gevent` and suits I/O-heavy load.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = _env_int('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+threads = _env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 200)
+
+# ── Startup ──
+# Import the app (and run create_app) once in the master, then fork.
+preload_app = True
+
+# ── Recycling and timeouts ──
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# ── Metrics ──
+# Workers write Prometheus samples here so /metrics aggregates all of them.
+# Must be set before the app (and prometheus_client) is imported.
+if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='tutorhub-metrics-')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', None)
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    """Discard samples left over from a previous run of the master."""
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+    for path in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    """Stop counting a dead worker's live gauges (in-flight requests, queue depth)."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Let the outbox dispatcher finish its current batch before the worker goes away."""
+    from utils.outbox import dispatcher
+    dispatcher.stop()
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master, then start per-worker background threads."""
+    from database.db import db
+    from utils.outbox import dispatcher
+    app = server.app.wsgi()
+    with app.app_context():
+        # Every bind, including the read replica's (DATABASE_REPLICA_URL)
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    if app.config.get('OUTBOX_DISPATCH_IN_PROCESS'):
+        dispatcher.start(app)
@@ -0,0 +1,110 @@
+"""
+Prometheus metrics for TutorHub, served at ``/metrics``.
+
+Records per-endpoint latency histograms, in-flight requests, database pool
+checkout waits and background queue depth. Under gunicorn, set
+``PROMETHEUS_MULTIPROC_DIR`` (gunicorn.conf.py does this) so every worker
+writes its samples to shared files and ``/metrics`` aggregates all of them.
+"""
+
+import os
+import time
+from functools import wraps
+from flask import Response, abort, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+from database.db import db
+
+REQUEST_LATENCY = Histogram(
+    'tutorhub_request_latency_seconds',
+    'Request latency by endpoint.',
+    ['endpoint', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'tutorhub_requests_in_progress',
+    'Requests currently being handled.',
+    multiprocess_mode='livesum',
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'tutorhub_db_pool_checkout_wait_seconds',
+    'Time spent waiting for a database connection from the pool.',
+    ['bind'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+BACKGROUND_QUEUE_DEPTH = Gauge(
+    'tutorhub_background_queue_depth',
+    'Pending items in a database-backed background queue.',
+    ['queue'],
+    multiprocess_mode='livemax',  # every worker samples the same table
+)
+EMAIL_MESSAGES = Counter(
+    'tutorhub_email_messages_total',
+    'Email delivery attempts by outcome (sent, failed, dead).',
+    ['outcome'],
+)
+
+
+def _timed_checkout(raw_connection, bind_name):
+    """Wrap Engine.raw_connection (a pool checkout) so the wait is observed."""
+    histogram = DB_POOL_CHECKOUT_WAIT.labels(bind=bind_name)
+
+    @wraps(raw_connection)
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return timed_raw_connection
+
+
+def render_metrics():
+    """Prometheus text exposition for this process or, in multiprocess mode, all workers."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def init_app(app):
+    """Install request timing hooks, pool timing and the /metrics endpoint."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    token = app.config.get('METRICS_TOKEN')
+    if not token and not app.debug:
+        # Request, SQL and per-endpoint figures must not be public
+        raise RuntimeError('METRICS_TOKEN must be set when METRICS_ENABLED is on outside debug mode')
+
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            # Wrapping the engine (not the pool) survives engine.dispose() after fork
+            engine.raw_connection = _timed_checkout(engine.raw_connection, bind_key or 'primary')
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+
+    @app.teardown_request
+    def observe_request(exc):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        REQUESTS_IN_PROGRESS.dec()
+        if request.endpoint != 'metrics':
+            REQUEST_LATENCY.labels(
+                endpoint=request.endpoint or 'unmatched',
+                method=request.method,
+            ).observe(time.perf_counter() - started)
+
+    @app.route('/metrics')
+    def metrics():
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            abort(404)
+        return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,146 @@
+"""
+On-demand cProfile capture for individual production requests.
+
+A request is profiled only when it carries a valid ``X-Profile`` header,
+signed with ``PROFILING_SECRET`` for that exact path and a recent timestamp.
+Generate one with:
+
+    flask --app wsgi profile-header /dashboard
+
+The resulting ``.prof`` file (pstats format; open with snakeviz or convert
+to a flamegraph with flameprof) lands in ``PROFILING_DIR``. Requests without
+the header pay only a single environ lookup.
+"""
+
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+
+import click
+
+HEADER_ENVIRON_KEY = 'HTTP_X_PROFILE'
+SIGNATURE_MAX_AGE = 300  # seconds
+
+_UNSAFE_FILENAME = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+def sign_profile_request(secret, path, timestamp=None):
+    """Return an ``X-Profile`` header value authorizing a profile of ``path``."""
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    signature = hmac.new(secret.encode(), f'{timestamp}:{path}'.encode(), hashlib.sha256)
+    return f'{timestamp}.{signature.hexdigest()}'
+
+
+def verify_profile_request(secret, path, header, now=None):
+    try:
+        timestamp, _ = header.split('.', 1)
+        timestamp = int(timestamp)
+    except ValueError:
+        return False
+    now = now if now is not None else time.time()
+    if abs(now - timestamp) > SIGNATURE_MAX_AGE:
+        return False
+    return hmac.compare_digest(header, sign_profile_request(secret, path, timestamp))
+
+
+class _RateLimiter:
+    """Allow at most ``limit`` events per rolling ``window`` seconds."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._events = []
+        self._lock = threading.Lock()
+
+    def allow(self):
+        now = time.monotonic()
+        with self._lock:
+            self._events = [t for t in self._events if now - t < self.window]
+            if len(self._events) >= self.limit:
+                return False
+            self._events.append(now)
+            return True
+
+
+class ProfilingMiddleware:
+    """WSGI middleware that profiles requests carrying a signed ``X-Profile`` header."""
+
+    def __init__(self, wsgi_app, secret, output_dir, limit=10, window=3600):
+        self.wsgi_app = wsgi_app
+        self.secret = secret
+        self.output_dir = output_dir
+        self.limiter = _RateLimiter(limit, window)
+        # cProfile can't nest; only one profiled request per process at a time
+        self._active = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        header = environ.get(HEADER_ENVIRON_KEY)
+        if not header:
+            return self.wsgi_app(environ, start_response)
+
+        path = environ.get('PATH_INFO', '')
+        if not verify_profile_request(self.secret, path, header):
+            return self.wsgi_app(environ, start_response)
+        if not self.limiter.allow() or not self._active.acquire(blocking=False):
+            return self.wsgi_app(environ, start_response)
+
+        try:
+            return self._profile(environ, start_response, path)
+        finally:
+            self._active.release()
+
+    def _profile(self, environ, start_response, path):
+        filename = self._output_path(path)
+
+        def start_with_header(status, headers, exc_info=None):
+            headers.append(('X-Profile-File', os.path.basename(filename)))
+            return start_response(status, headers, exc_info)
+
+        import cProfile  # only profiled requests need it
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            # Consume the body inside the profile so streamed work is included
+            result = self.wsgi_app(environ, start_with_header)
+            try:
+                body = b''.join(result)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        finally:
+            profiler.disable()
+            os.makedirs(self.output_dir, exist_ok=True)
+            profiler.dump_stats(filename)
+        return [body]
+
+    def _output_path(self, path):
+        slug = _UNSAFE_FILENAME.sub('-', path).strip('-') or 'root'
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        return os.path.join(self.output_dir, f'{stamp}-{slug}-{os.getpid()}.prof')
+
+
+def init_app(app):
+    """Wrap the app in the profiling middleware when PROFILING_SECRET is set."""
+    secret = app.config.get('PROFILING_SECRET')
+
+    @app.cli.command('profile-header')
+    @click.argument('path')
+    def profile_header_command(path):
+        """Print an X-Profile header value for PATH (valid for 5 minutes)."""
+        if not secret:
+            raise click.ClickException('PROFILING_SECRET is not set.')
+        click.echo(f'X-Profile: {sign_profile_request(secret, path)}')
+
+    if not secret:
+        return
+
+    app.wsgi_app = ProfilingMiddleware(
+        app.wsgi_app,
+        secret=secret,
+        output_dir=app.config['PROFILING_DIR'],
+        limit=app.config.get('PROFILING_RATE_LIMIT', 10),
+        window=app.config.get('PROFILING_RATE_WINDOW', 3600),
+    )
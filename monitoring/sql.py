@@ -0,0 +1,139 @@
+"""
+Per-request SQL instrumentation and N+1 detection.
+
+Hooks the engine's cursor events to count queries, total their time and keep
+the slowest statements for each request. Statements that repeat with the same
+shape are flagged as likely N+1 loops (e.g. one query per student).
+
+``SQL_INSTRUMENTATION`` selects the output:
+    headers  X-DB-* response headers (development default)
+    log      one JSON line per request on the ``tutorhub.sql`` logger
+    off      no listeners are attached at all
+"""
+
+import heapq
+import json
+import logging
+import re
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from database.db import db
+
+logger = logging.getLogger('tutorhub.sql')
+
+_WHITESPACE = re.compile(r'\s+')
+_PARAM_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|%\(\w+\)s))*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SELECT_LIST = re.compile(r'^SELECT .+? FROM ', re.IGNORECASE)
+
+
+def statement_shape(statement):
+    """Normalize a statement so that queries differing only in parameters compare equal."""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PARAM_LIST.sub('(?)', shape)
+    return _NUMBER.sub('?', shape)
+
+
+class QueryStats:
+    """Query counters for a single request."""
+
+    def __init__(self, keep_slowest=3):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.keep_slowest = keep_slowest
+        self.slowest = []       # min-heap of (seconds, statement)
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+        if len(self.slowest) < self.keep_slowest:
+            heapq.heappush(self.slowest, (seconds, statement))
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, statement))
+
+    def slowest_first(self):
+        return sorted(self.slowest, reverse=True)
+
+    def repeated_shapes(self, threshold):
+        """Statement shapes run at least ``threshold`` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_stats' in g:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if started and has_request_context() and 'sql_stats' in g:
+        g.sql_stats.record(statement, time.perf_counter() - started.pop())
+
+
+def _one_line(text, limit=200):
+    """Collapse a statement onto one line, eliding the select list."""
+    text = _WHITESPACE.sub(' ', text).strip()
+    return _SELECT_LIST.sub('SELECT ... FROM ', text)[:limit]
+
+
+def init_app(app):
+    """Attach query listeners and per-request reporting when instrumentation is enabled."""
+    mode = (app.config.get('SQL_INSTRUMENTATION') or 'off').lower()
+    if mode not in ('headers', 'log'):
+        return
+
+    threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    keep_slowest = app.config.get('SQL_SLOWEST_STATEMENTS', 3)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    if mode == 'log' and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    @app.before_request
+    def start_sql_stats():
+        g.sql_stats = QueryStats(keep_slowest)
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+
+        suspects = stats.repeated_shapes(threshold)
+        total_ms = round(stats.total_seconds * 1000, 2)
+
+        if mode == 'headers':
+            response.headers['X-DB-Query-Count'] = str(stats.count)
+            response.headers['X-DB-Time-Ms'] = str(total_ms)
+            if stats.slowest:
+                response.headers['X-DB-Slowest-Ms'] = str(round(stats.slowest_first()[0][0] * 1000, 2))
+            if suspects:
+                shape, n = suspects[0]
+                response.headers['X-DB-N-Plus-One'] = f'{len(suspects)}; top={n}x {_one_line(shape, 120)}'
+        else:
+            logger.info(json.dumps({
+                'event': 'sql_stats',
+                'method': request.method,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'queries': stats.count,
+                'db_ms': total_ms,
+                'slowest': [
+                    {'ms': round(seconds * 1000, 2), 'sql': _one_line(statement)}
+                    for seconds, statement in stats.slowest_first()
+                ],
+                'n_plus_one': [{'count': n, 'sql': _one_line(shape)} for shape, n in suspects],
+            }))
+        return response
@@ -1,22 +1,15 @@
-import re
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from database.db import db
 from database.models import Availability
 from scheduling.utils import DAY_NAMES, save_availability_from_form
+from auth.utils import claim_slug, slugify
 
 onboarding_bp = Blueprint('onboarding', __name__, url_prefix='/onboarding')
 
 TOTAL_STEPS = 5
 
 
-def slugify(text):
-    text = text.lower().strip()
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[\s_]+', '-', text)
-    return text
-
-
 @onboarding_bp.route('', methods=['GET', 'POST'])
 @login_required
 def wizard():
@@ -137,12 +130,8 @@ def _save_step1(form_data):
     new_slug = form_data.get('profile_slug', '').strip()
     if new_slug and new_slug != current_user.profile_slug:
         new_slug = slugify(new_slug)
-        from database.models import User
-        existing = User.query.filter_by(profile_slug=new_slug).first()
-        if existing and existing.id != current_user.id:
+        if new_slug and not claim_slug(current_user, new_slug):
             flash('That profile URL is already taken. We kept your current one.', 'error')
-        else:
-            current_user.profile_slug = new_slug
 
     db.session.commit()
 
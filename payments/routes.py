@@ -3,6 +3,7 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from database.db import db
 from database.models import Session, Student, Invoice
+from utils.archive import sessions_by_ids
 
 payments_bp = Blueprint('payments', __name__, url_prefix='/payments')
 
@@ -91,7 +92,7 @@ def generate_invoice():
 def view_invoice(invoice_id):
     invoice = Invoice.query.filter_by(id=invoice_id, user_id=current_user.id).first_or_404()
     session_id_list = [int(sid) for sid in invoice.session_ids.split(',') if sid]
-    sessions = Session.query.filter(Session.id.in_(session_id_list)).all()
+    sessions = sessions_by_ids(session_id_list)
     student = Student.query.get(invoice.student_id) if invoice.student_id else None
 
     return render_template('payments/invoice.html',
@@ -12,7 +12,10 @@ def save_availability_from_form(user_id, form_data):
     Clears existing availability and creates new records from form fields.
     Returns the number of days with availability set.
     """
-    Availability.query.filter_by(user_id=user_id).delete()
+    # Row by row (a tutor has a handful), so the booking cache hooks see the change
+    for availability in Availability.query.filter_by(user_id=user_id):
+        db.session.delete(availability)
+    db.session.flush()
 
     days_set = 0
     for i in range(7):
@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from database.db import db
-from database.models import Student, Session
+from database.models import Student
+from utils.archive import student_history
 
 students_bp = Blueprint('students', __name__, url_prefix='/students')
 
@@ -45,9 +46,7 @@ def add_student():
 @login_required
 def detail(student_id):
     student = Student.query.filter_by(id=student_id, user_id=current_user.id).first_or_404()
-    sessions = Session.query.filter_by(
-        student_id=student.id
-    ).order_by(Session.scheduled_at.desc()).all()
+    sessions = student_history(student.id)
     return render_template('students/detail.html', student=student, sessions=sessions)
 
 
@@ -0,0 +1,195 @@
+"""
+Archival of old sessions.
+
+``sessions`` only grows, but the dashboard, payments and scheduling pages
+only look at recent or unpaid rows. Sessions that are completed, paid, and
+were both scheduled and paid more than ``SESSIONS_ARCHIVE_AFTER_DAYS`` ago
+are moved to ``sessions_archive`` in batches. Each batch is one INSERT ...
+SELECT plus DELETE in a single transaction. Rows keep their ids, so invoices
+still resolve.
+
+On PostgreSQL ``sessions_archive`` is range-partitioned by ``scheduled_at``.
+The partition for a calendar year is created just before its first rows
+arrive, so whole years can later be detached or dropped.
+
+Pages that show full history read both tables through ``student_history``,
+``sessions_by_ids`` and ``archived_student_stats``. Everything else keeps
+querying ``Session`` and sees only the live set. Run one archiver at a time:
+
+    flask --app wsgi archive run
+    flask --app wsgi jobs enqueue sessions.archive
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import func, literal, or_, select, text
+from database.db import db
+from database.models import ArchivedSession, Session
+from utils.jobs import job
+
+# The dashboard compares this month with last month using live rows only
+MIN_AGE_DAYS = 62
+
+# Per-student totals over a tutor's archived sessions (all completed)
+ArchivedStats = namedtuple('ArchivedStats', 'count last_scheduled_at rating_total rated')
+NO_ARCHIVE = ArchivedStats(0, None, 0, 0)
+
+_LIVE = Session.__table__
+_ARCHIVE = ArchivedSession.__table__
+_COLUMNS = [column.name for column in _LIVE.columns]
+
+
+def _archivable(cutoff):
+    """Conditions for a live session that may be archived."""
+    return (
+        _LIVE.c.status == 'completed',
+        _LIVE.c.is_paid == True,
+        _LIVE.c.scheduled_at < cutoff,
+        or_(_LIVE.c.paid_date.is_(None), _LIVE.c.paid_date < cutoff),
+    )
+
+
+def ensure_partitions(conn, years):
+    """Create the yearly ``sessions_archive`` partitions for ``years`` (PostgreSQL only)."""
+    if conn.dialect.name != 'postgresql':
+        return
+    for year in sorted(years):
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS sessions_archive_y{int(year)} PARTITION OF sessions_archive "
+            f"FOR VALUES FROM ('{int(year)}-01-01') TO ('{int(year) + 1}-01-01')"
+        ))
+
+
+def archive_batch(cutoff, batch_size=1000, now=None):
+    """Move up to ``batch_size`` archivable sessions and commit. Returns (selected, moved)."""
+    now = now or datetime.utcnow()
+    rows = db.session.execute(
+        select(_LIVE.c.id, _LIVE.c.scheduled_at)
+        .where(*_archivable(cutoff))
+        .order_by(_LIVE.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.session.commit()
+        return 0, 0
+
+    ids = [row.id for row in rows]
+    ensure_partitions(db.session.connection(), {row.scheduled_at.year for row in rows})
+    # The conditions are repeated so a row changed since the SELECT stays live
+    # (SQLite takes no row locks)
+    still_archivable = (_LIVE.c.id.in_(ids), *_archivable(cutoff))
+    db.session.execute(_ARCHIVE.insert().from_select(
+        _COLUMNS + ['archived_at'],
+        select(*(_LIVE.c[name] for name in _COLUMNS), literal(now, _ARCHIVE.c.archived_at.type))
+        .where(*still_archivable),
+    ))
+    moved = db.session.execute(_LIVE.delete().where(*still_archivable)).rowcount
+    db.session.commit()
+    return len(rows), moved
+
+
+def archive_sessions(days, batch_size=1000, now=None):
+    """Archive every session older than ``days``, batch by batch. Returns how many moved."""
+    if days < MIN_AGE_DAYS:
+        raise ValueError(f'Sessions must be at least {MIN_AGE_DAYS} days old to archive')
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=days)
+    total = 0
+    while True:
+        # A batch can move nothing when its rows changed after the SELECT;
+        # stop only once no candidates are left
+        selected, moved = archive_batch(cutoff, batch_size, now)
+        total += moved
+        if not selected:
+            return total
+
+
+def restore_session(session_id):
+    """Move one archived session back to ``sessions`` (e.g. to correct it). Returns True if found."""
+    condition = _ARCHIVE.c.id == session_id
+    db.session.execute(_LIVE.insert().from_select(
+        _COLUMNS, select(*(_ARCHIVE.c[name] for name in _COLUMNS)).where(condition),
+    ))
+    restored = db.session.execute(_ARCHIVE.delete().where(condition)).rowcount
+    db.session.commit()
+    return bool(restored)
+
+
+# ── Reads across both tables ──
+
+def student_history(student_id):
+    """Every session of a student, live and archived, newest first."""
+    live = Session.query.filter_by(student_id=student_id).all()
+    archived = ArchivedSession.query.filter_by(student_id=student_id).all()
+    return sorted(live + archived, key=lambda s: s.scheduled_at, reverse=True)
+
+
+def sessions_by_ids(ids):
+    """Sessions with the given ids from whichever table holds them, oldest first."""
+    ids = set(ids)
+    found = Session.query.filter(Session.id.in_(ids)).all() if ids else []
+    missing = ids - {s.id for s in found}
+    if missing:
+        found += ArchivedSession.query.filter(ArchivedSession.id.in_(missing)).all()
+    return sorted(found, key=lambda s: s.scheduled_at)
+
+
+def archived_student_stats(user_id):
+    """{student_id: ArchivedStats} for a tutor's students, in one index-only query."""
+    rows = db.session.query(
+        ArchivedSession.student_id,
+        func.count(),
+        func.max(ArchivedSession.scheduled_at),
+        func.coalesce(func.sum(ArchivedSession.progress_rating), 0),
+        func.count(ArchivedSession.progress_rating),
+    ).filter(
+        ArchivedSession.user_id == user_id,
+        ArchivedSession.student_id.isnot(None),
+    ).group_by(ArchivedSession.student_id)
+    return {student_id: ArchivedStats(*values) for student_id, *values in rows}
+
+
+@job('sessions.archive', timeout=1800)
+def archive_job(days=None, batch_size=None):
+    """Archive old sessions using the configured age and batch size."""
+    config = current_app.config
+    archive_sessions(
+        days or config['SESSIONS_ARCHIVE_AFTER_DAYS'],
+        batch_size or config['SESSIONS_ARCHIVE_BATCH_SIZE'],
+    )
+
+
+def init_app(app):
+    """Register the ``flask archive`` commands."""
+    archive_cli = click.Group('archive', help='Move old paid sessions to sessions_archive.')
+
+    @archive_cli.command('run')
+    @click.option('--days', type=int, default=None, help='Override SESSIONS_ARCHIVE_AFTER_DAYS.')
+    def run_command(days):
+        """Archive completed, paid sessions older than the configured age."""
+        days = days or app.config['SESSIONS_ARCHIVE_AFTER_DAYS']
+        try:
+            moved = archive_sessions(days, app.config['SESSIONS_ARCHIVE_BATCH_SIZE'])
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f'Archived {moved} session(s) older than {days} days')
+
+    @archive_cli.command('status')
+    def status_command():
+        """Show live and archived session counts."""
+        click.echo(f'live     {db.session.query(func.count(Session.id)).scalar()}')
+        click.echo(f'archived {db.session.query(func.count(ArchivedSession.id)).scalar()}')
+
+    @archive_cli.command('restore')
+    @click.argument('session_id', type=int)
+    def restore_command(session_id):
+        """Move an archived session back to the live table."""
+        if not restore_session(session_id):
+            raise click.ClickException(f'Session {session_id} is not archived.')
+        click.echo(f'Restored session {session_id}')
+
+    app.cli.add_command(archive_cli)
@@ -0,0 +1,79 @@
+"""
+Self-hosted static assets built by ``assets/build.mjs``.
+
+The build writes content-hashed files to ``static/dist`` together with
+``manifest.json`` and precompressed ``.gz``/``.br`` siblings. ``asset_url``
+maps a logical name (``app.css``) to ``/assets/app.<hash>.css``; those URLs
+never change content, so they are served with a one-year immutable
+Cache-Control and the best precompressed variant the client accepts.
+
+Without a build (e.g. a fresh checkout), ``asset_url`` returns None and
+templates/_assets.html falls back to the CDN scripts.
+
+``asset_version()`` hashes the manifest. Pages cached by ETag include it, so
+a rebuild makes clients fetch HTML that points at the new hashed files.
+"""
+
+import hashlib
+import json
+import os
+
+from flask import abort, current_app, request, send_from_directory
+
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _load_manifest(dist_dir):
+    try:
+        with open(os.path.join(dist_dir, 'manifest.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_version():
+    """Short hash of the loaded manifest ('cdn' without a build)."""
+    return current_app.extensions['asset_version']
+
+
+def init_app(app):
+    """Load the manifest, expose ``asset_url`` to templates and serve ``/assets/``."""
+    dist_dir = os.path.join(app.static_folder, 'dist')
+    manifest = _load_manifest(dist_dir)
+    built = set(manifest.values())
+    app.extensions['asset_version'] = (
+        hashlib.sha1(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:8] if manifest else 'cdn'
+    )
+
+    @app.template_global()
+    def asset_url(name):
+        filename = manifest.get(name)
+        return f'/assets/{filename}' if filename else None
+
+    @app.route('/assets/<path:filename>')
+    def built_asset(filename):
+        if filename not in built:
+            abort(404)
+        path, encoding = filename, None
+        for candidate, suffix in ENCODINGS:
+            if request.accept_encodings[candidate] and os.path.exists(os.path.join(dist_dir, filename + suffix)):
+                path, encoding = filename + suffix, candidate
+                break
+
+        response = send_from_directory(
+            dist_dir, path, max_age=IMMUTABLE_MAX_AGE, conditional=True, etag=True,
+            mimetype=None if encoding is None else _mimetype(filename),
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+def _mimetype(filename):
+    return {'.css': 'text/css', '.js': 'text/javascript'}.get(
+        os.path.splitext(filename)[1], 'application/octet-stream',
+    )
@@ -0,0 +1,224 @@
+"""
+gzip / brotli response compression.
+
+``CompressionMiddleware`` wraps the WSGI app and compresses text responses
+(HTML, JSON, CSV, ...) for clients that send a matching ``Accept-Encoding``.
+Brotli is preferred when the optional ``brotli`` package is installed,
+otherwise gzip is used.
+
+Responses with a known ``Content-Length`` below ``COMPRESS_MIN_SIZE`` are
+left alone; larger ones are compressed in one go and get a new
+Content-Length. Responses without a Content-Length (generators, e.g. CSV
+exports) stay streamed: each chunk the app yields is compressed and flushed
+immediately, so yield reasonably sized batches rather than single rows.
+
+Anything that already has a ``Content-Encoding`` (the precompressed files
+under ``/assets/``), partial content, ``Cache-Control: no-transform`` and
+HEAD requests pass through untouched.
+
+``COMPRESS_ROUTES`` overrides the settings per endpoint or blueprint, e.g.
+``{'booking.api_slots': {'min_size': 256}, 'metrics': False}``.
+"""
+
+import zlib
+
+from flask import request
+from werkzeug.http import parse_accept_header, parse_options_header
+
+try:
+    import brotli  # optional; gzip is used without it
+except ImportError:
+    brotli = None
+
+ROUTE_ENVIRON_KEY = 'tutorhub.compress'
+SKIP_STATUSES = {204, 206, 304}
+
+
+class _Gzip:
+
+    def __init__(self, level):
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data):
+        return self._zlib.compress(data)
+
+    def flush(self):
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._zlib.flush()
+
+
+class _Brotli:
+
+    def __init__(self, quality):
+        self._brotli = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, data):
+        return self._brotli.process(data)
+
+    def flush(self):
+        return self._brotli.flush()
+
+    def finish(self):
+        return self._brotli.finish()
+
+
+def compressor(encoding, level):
+    """Return an incremental compressor for 'gzip' or 'br' at ``level``."""
+    return _Brotli(level) if encoding == 'br' else _Gzip(level)
+
+
+def compress_body(encoding, level, body):
+    """Compress a whole body in one call."""
+    codec = compressor(encoding, level)
+    return codec.compress(body) + codec.finish()
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _without(headers, *names):
+    names = {name.lower() for name in names}
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+
+def _add_vary(headers):
+    vary = _header(headers, 'Vary')
+    if vary is None:
+        return headers + [('Vary', 'Accept-Encoding')]
+    if 'accept-encoding' in vary.lower() or vary.strip() == '*':
+        return headers
+    return _without(headers, 'Vary') + [('Vary', f'{vary}, Accept-Encoding')]
+
+
+class CompressionMiddleware:
+    """WSGI middleware negotiating brotli or gzip for allowlisted content types."""
+
+    def __init__(self, wsgi_app, min_size=1024, mimetypes=(), gzip_level=6, brotli_quality=4):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        self.mimetypes = frozenset(mimetypes)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoding(self, environ):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return None
+        accept = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING'))
+        if brotli is not None and accept['br'] and accept['br'] >= accept['gzip']:
+            return 'br'
+        return 'gzip' if accept['gzip'] else None
+
+    def __call__(self, environ, start_response):
+        encoding = self._encoding(environ)
+        captured = []
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return written.append
+
+        result = self.wsgi_app(environ, capture)
+        status, headers, exc_info = captured
+
+        plan = self._plan(environ, status, headers, encoding)
+        if plan is None:
+            if self._eligible(status, headers):
+                headers = _add_vary(headers)
+            start_response(status, headers, exc_info)
+            return self._chain(written, result) if written else result
+
+        level, length = plan
+        headers = _add_vary(_without(headers, 'Content-Length'))
+        etag = _header(headers, 'ETag')
+        if etag and not etag.startswith('W/'):
+            # The bytes differ from the identity encoding, so only a weak match holds
+            headers = _without(headers, 'ETag') + [('ETag', f'W/{etag}')]
+        headers.append(('Content-Encoding', encoding))
+
+        if length is None:
+            start_response(status, headers, exc_info)
+            return self._stream(written, result, compressor(encoding, level))
+
+        try:
+            body = b''.join(written + list(result))
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        body = compress_body(encoding, level, body)
+        headers.append(('Content-Length', str(len(body))))
+        start_response(status, headers, exc_info)
+        return [body]
+
+    def _eligible(self, status, headers):
+        if int(status.split(' ', 1)[0]) in SKIP_STATUSES or _header(headers, 'Content-Encoding'):
+            return False
+        content_type, _ = parse_options_header(_header(headers, 'Content-Type'))
+        if content_type not in self.mimetypes:
+            return False
+        return 'no-transform' not in (_header(headers, 'Cache-Control') or '')
+
+    def _plan(self, environ, status, headers, encoding):
+        """Return (level, content_length) when the response should be compressed."""
+        if encoding is None or not self._eligible(status, headers):
+            return None
+        route = environ.get(ROUTE_ENVIRON_KEY, {})
+        if route is False:
+            return None
+        length = _header(headers, 'Content-Length')
+        length = int(length) if length is not None else None
+        if length is not None and length < route.get('min_size', self.min_size):
+            return None
+        if encoding == 'br':
+            return route.get('brotli_quality', self.brotli_quality), length
+        return route.get('gzip_level', self.gzip_level), length
+
+    @staticmethod
+    def _chain(written, result):
+        try:
+            yield from written
+            yield from result
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    @staticmethod
+    def _stream(written, result, codec):
+        try:
+            for chunk in written:
+                yield codec.compress(chunk)
+            for chunk in result:
+                if chunk:
+                    yield codec.compress(chunk) + codec.flush()
+            yield codec.finish()
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+
+def init_app(app):
+    """Install the middleware and the per-route overrides from ``COMPRESS_ROUTES``."""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    routes = app.config.get('COMPRESS_ROUTES') or {}
+    if routes:
+        @app.before_request
+        def apply_route_compression():
+            settings = routes.get(request.endpoint, routes.get(request.blueprint))
+            if settings is not None:
+                request.environ[ROUTE_ENVIRON_KEY] = settings
+
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=app.config['COMPRESS_MIN_SIZE'],
+        mimetypes=app.config['COMPRESS_MIMETYPES'],
+        gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+        brotli_quality=app.config['COMPRESS_BROTLI_QUALITY'],
+    )
@@ -1,119 +1,179 @@
 """
 Email notification service for TutorHub.
-Uses Gmail SMTP to send booking confirmations to tutors and students.
-Runs asynchronously so email failures never block the booking flow.
+Renders email from the Jinja templates in templates/emails/ and delivers
+mail over SMTP (Gmail by default).
+
+Booking emails are staged in the durable outbox (utils/outbox.py) inside the
+booking transaction; the outbox dispatcher sends them over a persistent
+``SMTPConnection`` that is reused across messages.
+
+Settings (environment):
+    MAIL_USERNAME / MAIL_PASSWORD   credentials; email is skipped when unset
+    MAIL_SERVER / MAIL_PORT / MAIL_USE_TLS   SMTP endpoint (smtp.gmail.com:587, STARTTLS)
 """
 
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from threading import Thread
-
-
-def send_booking_confirmation_async(tutor_email, tutor_name, student_name,
-                                     student_email, session_datetime,
-                                     duration_minutes, session_type,
-                                     subject='', meeting_link=None):
-    """Send booking confirmation emails in a background thread."""
-    thread = Thread(
-        target=_send_booking_emails,
-        args=(tutor_email, tutor_name, student_name, student_email,
-              session_datetime, duration_minutes, session_type,
-              subject, meeting_link),
-        daemon=True
+from collections import namedtuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+RenderedEmail = namedtuple('RenderedEmail', ['subject', 'html', 'text'])
+
+
+# ── Templates ──
+
+class EmailRenderer:
+    """Renders ``templates/emails/<name>.{subject.txt,html,txt}`` outside any request.
+
+    Templates are compiled once per process and kept by the environment's
+    cache. ``.html`` bodies are autoescaped; the subject and plain-text part
+    are not (they are never parsed as HTML).
+    """
+
+    def __init__(self, template_dir=TEMPLATE_DIR):
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(['html']),
+            undefined=StrictUndefined,
+            auto_reload=False,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+
+    def _templates(self, name):
+        return (
+            self.env.get_template(f'emails/{name}.subject.txt'),
+            self.env.get_template(f'emails/{name}.html'),
+            self.env.get_template(f'emails/{name}.txt'),
+        )
+
+    def render(self, name, **context):
+        return self.render_many(name, [context])[0]
+
+    def render_many(self, name, contexts):
+        """Render one message type for many recipients, looking the templates up once."""
+        subject, html, text = self._templates(name)
+        return [
+            RenderedEmail(
+                # Collapse whitespace so a value can never inject a header line
+                ' '.join(subject.render(context).split()),
+                html.render(context),
+                text.render(context),
+            )
+            for context in contexts
+        ]
+
+
+renderer = EmailRenderer()
+
+
+# ── Booking confirmations ──
+
+def queue_booking_confirmation(session_id, tutor_email, tutor_name, student_name,
+                               student_email, session_datetime,
+                               duration_minutes, session_type,
+                               subject='', meeting_link=None):
+    """Stage booking confirmation emails in the outbox (committed with the booking)."""
+    from utils.outbox import add_messages
+
+    context = booking_context(
+        tutor_name, student_name, student_email, session_datetime,
+        duration_minutes, session_type, subject, meeting_link,
     )
-    thread.start()
-
-
-def _send_booking_emails(tutor_email, tutor_name, student_name, student_email,
-                          session_datetime, duration_minutes, session_type,
-                          subject, meeting_link):
-    """Send both tutor and student notification emails."""
-    try:
-        formatted_date = session_datetime.strftime('%A, %B %d, %Y')
-        formatted_time = session_datetime.strftime('%I:%M %p')
-        type_label = 'Online' if session_type == 'online' else 'In-Person'
-
-        # --- Tutor notification ---
-        tutor_subject = f'New Booking: {student_name} on {formatted_date}'
-        tutor_html = f"""
-<div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-    <div style="background: #4F46E5; color: white; padding: 24px; border-radius: 8px 8px 0 0;">
-        <h1 style="margin: 0; font-size: 22px;">New Session Booked!</h1>
-    </div>
-    <div style="background: #ffffff; padding: 24px; border: 1px solid #E5E7EB; border-top: none; border-radius: 0 0 8px 8px;">
-        <p style="color: #374151; font-size: 16px;">Hi {tutor_name},</p>
-        <p style="color: #374151;">A new tutoring session has been booked:</p>
-        <table style="width: 100%; border-collapse: collapse; margin: 16px 0;">
-            <tr><td style="padding: 8px 0; color: #6B7280; width: 140px;">Student</td><td style="padding: 8px 0; color: #111827; font-weight: 600;">{student_name}</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Email</td><td style="padding: 8px 0; color: #111827;">{student_email}</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Date</td><td style="padding: 8px 0; color: #111827; font-weight: 600;">{formatted_date}</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Time</td><td style="padding: 8px 0; color: #111827; font-weight: 600;">{formatted_time}</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Duration</td><td style="padding: 8px 0; color: #111827;">{duration_minutes} minutes</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Type</td><td style="padding: 8px 0; color: #111827;">{type_label}</td></tr>
-            {'<tr><td style="padding: 8px 0; color: #6B7280;">Subject</td><td style="padding: 8px 0; color: #111827;">' + subject + '</td></tr>' if subject else ''}
-        </table>
-        <p style="color: #6B7280; font-size: 14px;">Check your TutorHub dashboard for full details.</p>
-    </div>
-</div>
-"""
-        _send_email(tutor_email, tutor_subject, tutor_html)
-
-        # --- Student confirmation ---
-        student_subject_line = f'Session Confirmed with {tutor_name}'
-        meeting_section = ''
-        if session_type == 'online' and meeting_link:
-            meeting_section = f"""
-        <div style="background: #EEF2FF; border: 1px solid #C7D2FE; border-radius: 8px; padding: 16px; margin: 16px 0;">
-            <p style="color: #4F46E5; font-weight: 600; margin: 0 0 8px 0;">Meeting Link</p>
-            <a href="{meeting_link}" style="color: #4F46E5; word-break: break-all;">{meeting_link}</a>
-            <p style="color: #6B7280; font-size: 13px; margin: 8px 0 0 0;">Please join 5 minutes before your session starts.</p>
-        </div>
-"""
+    add_messages([
+        (tutor_email, renderer.render('booking_tutor', **context), f'booking:{session_id}:tutor'),
+        (student_email, renderer.render('booking_student', **context), f'booking:{session_id}:student'),
+    ])
 
-        student_html = f"""
-<div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-    <div style="background: #4F46E5; color: white; padding: 24px; border-radius: 8px 8px 0 0;">
-        <h1 style="margin: 0; font-size: 22px;">Session Confirmed!</h1>
-    </div>
-    <div style="background: #ffffff; padding: 24px; border: 1px solid #E5E7EB; border-top: none; border-radius: 0 0 8px 8px;">
-        <p style="color: #374151; font-size: 16px;">Hi {student_name},</p>
-        <p style="color: #374151;">Your tutoring session with <strong>{tutor_name}</strong> is confirmed:</p>
-        <table style="width: 100%; border-collapse: collapse; margin: 16px 0;">
-            <tr><td style="padding: 8px 0; color: #6B7280; width: 140px;">Date</td><td style="padding: 8px 0; color: #111827; font-weight: 600;">{formatted_date}</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Time</td><td style="padding: 8px 0; color: #111827; font-weight: 600;">{formatted_time}</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Duration</td><td style="padding: 8px 0; color: #111827;">{duration_minutes} minutes</td></tr>
-            <tr><td style="padding: 8px 0; color: #6B7280;">Type</td><td style="padding: 8px 0; color: #111827;">{type_label}</td></tr>
-            {'<tr><td style="padding: 8px 0; color: #6B7280;">Subject</td><td style="padding: 8px 0; color: #111827;">' + subject + '</td></tr>' if subject else ''}
-        </table>
-        {meeting_section}
-        <p style="color: #6B7280; font-size: 14px;">If you need to reschedule, please contact {tutor_name} directly.</p>
-    </div>
-</div>
-"""
-        _send_email(student_email, student_subject_line, student_html)
 
-    except Exception as e:
-        # Log but never crash â booking already succeeded
-        print(f'[TutorHub Email] Error sending notifications: {e}')
+def booking_context(tutor_name, student_name, student_email, session_datetime,
+                    duration_minutes, session_type, subject='', meeting_link=None):
+    """Template variables shared by the booking emails."""
+    return {
+        'tutor_name': tutor_name,
+        'student_name': student_name,
+        'student_email': student_email,
+        'formatted_date': session_datetime.strftime('%A, %B %d, %Y'),
+        'formatted_time': session_datetime.strftime('%I:%M %p'),
+        'duration_minutes': duration_minutes,
+        'type_label': 'Online' if session_type == 'online' else 'In-Person',
+        'subject': subject,
+        'meeting_link': meeting_link if session_type == 'online' else None,
+    }
 
 
-def _send_email(to_email, subject, html_body):
-    """Send a single HTML email via Gmail SMTP."""
-    username = os.getenv('MAIL_USERNAME', '')
-    password = os.getenv('MAIL_PASSWORD', '')
+def _env_bool(name, default):
+    value = os.getenv(name, '')
+    return value.lower() in ('1', 'true', 'yes') if value.strip() else default
 
-    if not username or not password:
-        return  # Email not configured â skip silently
+
+def _compose(sender, to_email, subject, html_body, text_body=None):
+    # Imported here so web workers that never send mail skip email.mime at startup
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
 
     msg = MIMEMultipart('alternative')
-    msg['From'] = f'TutorHub <{username}>'
+    msg['From'] = f'TutorHub <{sender}>'
     msg['To'] = to_email
     msg['Subject'] = subject
+    # Clients show the last part they understand, so plain text goes first
+    if text_body:
+        msg.attach(MIMEText(text_body, 'plain'))
     msg.attach(MIMEText(html_body, 'html'))
+    return msg
+
+
+class SMTPConnection:
+    """A persistent SMTP session that connects lazily and reconnects on failure."""
+
+    def __init__(self, host=None, port=None, username=None, password=None, use_tls=None,
+                 timeout=30):
+        self.host = host or os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+        self.port = int(port or os.getenv('MAIL_PORT', '587'))
+        self.username = username if username is not None else os.getenv('MAIL_USERNAME', '')
+        self.password = password if password is not None else os.getenv('MAIL_PASSWORD', '')
+        self.use_tls = use_tls if use_tls is not None else _env_bool('MAIL_USE_TLS', True)
+        self.timeout = timeout
+        self._server = None
+
+    @property
+    def configured(self):
+        return bool(self.username and self.password)
+
+    def _connect(self):
+        import smtplib
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+
+    def send(self, to_email, subject, html_body, text_body=None):
+        """Send one message, reconnecting once if the session went stale."""
+        from smtplib import SMTPServerDisconnected
+        msg = _compose(self.username, to_email, subject, html_body, text_body)
+        for attempt in (1, 2):
+            if self._server is None:
+                self._connect()
+            try:
+                self._server.send_message(msg)
+                return
+            except (SMTPServerDisconnected, OSError):
+                self.close()
+                if attempt == 2:
+                    raise
 
-    with smtplib.SMTP('smtp.gmail.com', 587) as server:
-        server.starttls()
-        server.login(username, password)
-        server.send_message(msg)
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
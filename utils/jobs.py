@@ -0,0 +1,272 @@
+"""
+Database-backed background jobs.
+
+Register a function with ``@job`` and stage calls to it with ``enqueue``
+inside the request's transaction; the request commits and returns at once,
+and a worker process picks the job up:
+
+    @job('invoices.render_pdf', timeout=120, max_attempts=5)
+    def render_pdf(invoice_id):
+        ...
+
+    enqueue('invoices.render_pdf', invoice_id=invoice.id)
+    db.session.commit()
+
+    flask --app wsgi jobs work
+
+Jobs are claimed one at a time, lowest ``priority`` first, with ``SKIP
+LOCKED`` on PostgreSQL and a conditional lease update everywhere, so any
+number of workers can run. A job that raises is retried with exponential
+backoff until ``max_attempts``, then dead-lettered. A job that overruns its
+``timeout`` is interrupted (SIGALRM) and counts as a failed attempt; if its
+worker dies, the lease expires and another worker retries it.
+
+Workers also queue the housekeeping jobs in ``JOBS_SCHEDULE`` ({name:
+seconds}) once per interval, so a deployment needs no separate cron for them.
+"""
+
+import json
+import signal
+import threading
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import func, or_, update
+from database.db import db
+from database.models import Job
+from monitoring.metrics import BACKGROUND_QUEUE_DEPTH
+
+JOBS_DEPTH = BACKGROUND_QUEUE_DEPTH.labels(queue='jobs')
+
+JobSpec = namedtuple('JobSpec', ['fn', 'timeout', 'max_attempts', 'priority'])
+
+JOBS = {}
+
+# Extra lease time beyond the job's timeout before another worker may take it
+LEASE_GRACE = 30
+
+# Seconds between JOBS_SCHEDULE checks in each worker
+SCHEDULE_CHECK_INTERVAL = 60
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def job(name, timeout=60, max_attempts=3, priority=0):
+    """Register the decorated function as the job ``name``."""
+    def decorator(fn):
+        JOBS[name] = JobSpec(fn, timeout, max_attempts, priority)
+        return fn
+    return decorator
+
+
+def enqueue(name, priority=None, run_at=None, **payload):
+    """Stage a job in the current transaction; the caller commits."""
+    if name not in JOBS:
+        raise ValueError(f'Unknown job: {name}')
+    queued = Job(
+        name=name,
+        payload=json.dumps(payload),
+        priority=JOBS[name].priority if priority is None else priority,
+        run_at=run_at or datetime.utcnow(),
+    )
+    db.session.add(queued)
+    return queued
+
+
+# ── Worker ──
+
+def _due(now):
+    """Conditions for a job that may be claimed at ``now``."""
+    return (
+        Job.status == 'queued',
+        Job.run_at <= now,
+        or_(Job.locked_until.is_(None), Job.locked_until < now),
+    )
+
+
+def claim_job(token, now=None):
+    """Lease the next due job for ``token``. Returns the Job or None."""
+    now = now or datetime.utcnow()
+    candidates = (
+        db.session.query(Job.id, Job.name)
+        .filter(*_due(now))
+        .order_by(Job.priority, Job.run_at, Job.id)
+        .limit(5)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    for job_id, name in candidates:
+        spec = JOBS.get(name)
+        lease = (spec.timeout if spec else 0) + LEASE_GRACE
+        # Re-check everything, not just the lease: SQLite has no SKIP LOCKED, and
+        # a job another worker finished (or backed off) meanwhile has no lease
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, *_due(now))
+            .values(claimed_by=token, locked_until=now + timedelta(seconds=lease),
+                    attempts=Job.attempts + 1),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        if claimed:
+            db.session.commit()
+            return db.session.get(Job, job_id, populate_existing=True)
+    db.session.commit()
+    return None
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Raise JobTimeout after ``seconds``; only possible on the main thread."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _expired(signum, frame):
+        raise JobTimeout(f'timed out after {seconds}s')
+
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_job(claimed, backoff_base=30, backoff_cap=3600):
+    """Run a claimed job and record the outcome. Returns True on success."""
+    job_id, spec = claimed.id, JOBS.get(claimed.name)
+    error = None
+    if spec is None:
+        error = f'Unknown job: {claimed.name}'
+    else:
+        try:
+            with _time_limit(spec.timeout):
+                spec.fn(**json.loads(claimed.payload or '{}'))
+            db.session.commit()
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+
+    db.session.rollback()  # discard whatever a failed job left behind
+    finished = db.session.get(Job, job_id)
+    finished.claimed_by = None
+    finished.locked_until = None
+    if error is None:
+        finished.status = 'done'
+        finished.finished_at = datetime.utcnow()
+    else:
+        finished.last_error = error[:1000]
+        if spec is None or finished.attempts >= spec.max_attempts:
+            finished.status = 'dead'
+            finished.finished_at = datetime.utcnow()
+            print(f'[TutorHub Jobs] Dead-lettered job #{job_id} {finished.name}: {error}')
+        else:
+            delay = min(backoff_base * (2 ** (finished.attempts - 1)), backoff_cap)
+            finished.run_at = datetime.utcnow() + timedelta(seconds=delay)
+    db.session.commit()
+    return error is None
+
+
+def queued_count():
+    return Job.query.filter_by(status='queued').count()
+
+
+def enqueue_periodic(schedule, now=None):
+    """Queue each job in ``schedule`` ({name: seconds}) last queued at least that long ago.
+
+    A job that is still queued or running is not queued again. Two workers
+    checking at the same moment may both queue one; every scheduled job is
+    safe to run twice. Returns the names queued.
+    """
+    now = now or datetime.utcnow()
+    queued = []
+    for name, interval in schedule.items():
+        last = db.session.query(func.max(Job.created_at)).filter(Job.name == name).scalar()
+        if last is not None and last > now - timedelta(seconds=interval):
+            continue
+        if Job.query.filter_by(name=name, status='queued').first() is not None:
+            continue
+        enqueue(name)
+        queued.append(name)
+    db.session.commit()
+    return queued
+
+
+@job('jobs.purge', timeout=300)
+def purge_finished(days=30):
+    """Delete jobs that finished more than ``days`` ago."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    Job.query.filter(Job.status.in_(['done', 'dead']), Job.finished_at < cutoff).delete(
+        synchronize_session=False,
+    )
+
+
+def init_app(app):
+    """Register the ``flask jobs`` commands."""
+    jobs_cli = click.Group('jobs', help='Run and inspect background jobs.')
+
+    @jobs_cli.command('work')
+    @click.option('--once', is_flag=True, help='Run what is due now, then exit.')
+    def work_command(once):
+        """Run jobs until interrupted; SIGTERM finishes the current job first."""
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        token = str(uuid.uuid4())
+        next_schedule_check = 0
+        while not stopping:
+            try:
+                if time.monotonic() >= next_schedule_check:
+                    for name in enqueue_periodic(app.config['JOBS_SCHEDULE']):
+                        click.echo(f'Scheduled {name}')
+                    next_schedule_check = time.monotonic() + SCHEDULE_CHECK_INTERVAL
+                claimed = claim_job(token)
+                if claimed is not None:
+                    ok = run_job(claimed, backoff_base=app.config['JOBS_BACKOFF_BASE'])
+                    click.echo(f"Job #{claimed.id} {claimed.name}: {'done' if ok else 'failed'}")
+                    continue
+                JOBS_DEPTH.set(queued_count())
+            except Exception as e:
+                # e.g. the database restarting; an unfinished job's lease expires
+                db.session.rollback()
+                print(f'[TutorHub Jobs] Worker error: {e}')
+            if once:
+                break
+            time.sleep(app.config['JOBS_POLL_INTERVAL'])
+
+    @jobs_cli.command('enqueue')
+    @click.argument('name')
+    @click.option('--payload', default='{}', help='JSON keyword arguments for the job.')
+    @click.option('--priority', type=int, default=None)
+    def enqueue_command(name, payload, priority):
+        """Queue a registered job by name."""
+        try:
+            queued = enqueue(name, priority=priority, **json.loads(payload))
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        db.session.commit()
+        click.echo(f'Queued job #{queued.id}')
+
+    @jobs_cli.command('status')
+    def status_command():
+        """Show job counts by name and status."""
+        rows = db.session.query(Job.name, Job.status, func.count()).group_by(Job.name, Job.status)
+        for name, status, count in rows.order_by(Job.name):
+            click.echo(f'{name:<32} {status:<8} {count}')
+
+    @jobs_cli.command('retry-dead')
+    def retry_dead_command():
+        """Move dead-lettered jobs back to the queue."""
+        count = Job.query.filter_by(status='dead').update({
+            'status': 'queued', 'attempts': 0, 'run_at': datetime.utcnow(), 'finished_at': None,
+        })
+        db.session.commit()
+        click.echo(f'Requeued {count} job(s)')
+
+    app.cli.add_command(jobs_cli)
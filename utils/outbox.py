@@ -0,0 +1,281 @@
+"""
+Durable email outbox.
+
+Messages are written to the ``outbox`` table in the same transaction as the
+change that caused them (e.g. the Session insert in confirm_booking), so
+they survive crashes and never add SMTP time to a request. A dispatcher
+drains due rows in batches over one reused SMTP connection, retrying
+failures with exponential backoff and dead-lettering after
+``OUTBOX_MAX_ATTEMPTS``.
+
+Rows are claimed with a short lease (``claimed_by`` / ``locked_until``) so any
+number of dispatchers, in-process threads or ``flask outbox dispatch``
+processes can run at once; a dispatcher that dies mid-batch simply lets its
+lease expire. Delivery is at-least-once.
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import func, or_, update
+from database.db import db
+from database.models import OutboxMessage
+from monitoring.metrics import BACKGROUND_QUEUE_DEPTH, EMAIL_MESSAGES
+from utils.email_service import SMTPConnection
+from utils.jobs import job
+
+OUTBOX_DEPTH = BACKGROUND_QUEUE_DEPTH.labels(queue='email')
+
+
+def add_message(to_email, email, dedupe_key):
+    """Stage an email in the current transaction. Returns False if skipped or a duplicate."""
+    return add_messages([(to_email, email, dedupe_key)]) == 1
+
+
+def add_messages(messages):
+    """Stage many (to, RenderedEmail, dedupe_key) emails with one duplicate check.
+
+    Nothing is committed; the caller's commit makes them durable. When email
+    isn't configured nothing is staged, so the table doesn't fill up.
+    """
+    messages = [m for m in messages if m[0]]
+    if not messages or not SMTPConnection().configured:
+        return 0
+    keys = [m[2] for m in messages]
+    existing = {
+        key for (key,) in db.session.query(OutboxMessage.dedupe_key)
+        .filter(OutboxMessage.dedupe_key.in_(keys))
+    }
+    added = 0
+    for to_email, email, dedupe_key in messages:
+        if dedupe_key in existing:
+            continue
+        existing.add(dedupe_key)
+        db.session.add(OutboxMessage(
+            dedupe_key=dedupe_key,
+            to_email=to_email,
+            subject=email.subject,
+            html_body=email.html,
+            text_body=email.text,
+        ))
+        added += 1
+    return added
+
+
+def _backoff(attempts, base, cap):
+    return timedelta(seconds=min(base * (2 ** (attempts - 1)), cap))
+
+
+def _due(now):
+    """Conditions for a message that may be claimed at ``now``."""
+    return (
+        OutboxMessage.status == 'pending',
+        OutboxMessage.next_attempt_at <= now,
+        or_(OutboxMessage.locked_until.is_(None), OutboxMessage.locked_until < now),
+    )
+
+
+def dispatch_batch(connection, batch_size=50, lease_seconds=300, max_attempts=8,
+                   backoff_base=30, backoff_cap=3600):
+    """Claim and deliver up to ``batch_size`` due messages. Returns how many were claimed."""
+    now = datetime.utcnow()
+    token = str(uuid.uuid4())
+
+    due_ids = (
+        db.session.query(OutboxMessage.id)
+        .filter(*_due(now))
+        .order_by(OutboxMessage.next_attempt_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+    ids = [row.id for row in due_ids]
+    if not ids:
+        db.session.commit()
+        return 0
+
+    # The whole due condition is re-checked in the UPDATE, so a concurrent
+    # dispatcher (or SQLite, which ignores SKIP LOCKED) that selected the same
+    # rows cannot claim one again after it was sent or backed off.
+    db.session.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(ids), *_due(now))
+        .values(claimed_by=token, locked_until=now + timedelta(seconds=lease_seconds)),
+        execution_options={'synchronize_session': False},
+    )
+    db.session.commit()
+
+    batch = OutboxMessage.query.filter_by(claimed_by=token, status='pending').all()
+    if not batch:
+        return 0
+
+    for message in batch:
+        try:
+            connection.send(message.to_email, message.subject, message.html_body, message.text_body)
+        except Exception as e:
+            message.attempts = (message.attempts or 0) + 1
+            message.last_error = str(e)[:1000]
+            if message.attempts >= max_attempts:
+                message.status = 'dead'
+                EMAIL_MESSAGES.labels(outcome='dead').inc()
+                print(f'[TutorHub Email] Dead-lettered outbox #{message.id} to {message.to_email}: {e}')
+            else:
+                message.next_attempt_at = datetime.utcnow() + _backoff(message.attempts, backoff_base, backoff_cap)
+                EMAIL_MESSAGES.labels(outcome='failed').inc()
+        else:
+            message.status = 'sent'
+            message.sent_at = datetime.utcnow()
+            message.attempts = (message.attempts or 0) + 1
+            EMAIL_MESSAGES.labels(outcome='sent').inc()
+        message.claimed_by = None
+        message.locked_until = None
+    db.session.commit()
+    return len(batch)
+
+
+def pending_count():
+    return OutboxMessage.query.filter_by(status='pending').count()
+
+
+@job('outbox.purge', timeout=300)
+def purge_sent(days=30):
+    """Delete messages delivered more than ``days`` ago."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    OutboxMessage.query.filter(OutboxMessage.status == 'sent', OutboxMessage.sent_at < cutoff).delete(
+        synchronize_session=False,
+    )
+
+
+class OutboxDispatcher:
+    """Background threads that drain the outbox, each with its own SMTP connection."""
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._threads = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self, app):
+        """Start the dispatcher threads in this process (no-op if already running)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            # Threads don't survive fork, so each gunicorn worker starts its own
+            if self._pid == os.getpid():
+                return
+            self.app = app
+            self._wake = threading.Event()
+            self._stop = threading.Event()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'outbox-{i}', daemon=True)
+                for i in range(app.config.get('OUTBOX_WORKERS', 1))
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    def notify(self):
+        """Wake the dispatchers after new messages were committed."""
+        self._wake.set()
+
+    def _run(self):
+        config = self.app.config
+        connection = SMTPConnection()
+        idle_since = time.monotonic()
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                with self.app.app_context():
+                    if connection.configured:
+                        claimed = dispatch_batch(
+                            connection,
+                            batch_size=config['OUTBOX_BATCH_SIZE'],
+                            max_attempts=config['OUTBOX_MAX_ATTEMPTS'],
+                            backoff_base=config['OUTBOX_BACKOFF_BASE'],
+                        )
+                    OUTBOX_DEPTH.set(pending_count())
+            except Exception as e:
+                print(f'[TutorHub Email] Outbox dispatch error: {e}')
+            if claimed:
+                idle_since = time.monotonic()
+                continue
+            if time.monotonic() - idle_since > config['OUTBOX_IDLE_TIMEOUT']:
+                connection.close()  # Don't hold idle sessions open
+            self._wake.wait(config['OUTBOX_POLL_INTERVAL'])
+            self._wake.clear()
+        connection.close()
+
+    def stop(self, timeout=10):
+        """Let in-flight batches finish, then stop. Undelivered rows stay in the table."""
+        if self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._wake.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        self._pid = None
+
+
+dispatcher = OutboxDispatcher()
+
+
+def notify_dispatcher():
+    """Call after committing outbox rows so the in-process dispatcher sends them promptly."""
+    if current_app.config.get('OUTBOX_DISPATCH_IN_PROCESS'):
+        dispatcher.start(current_app._get_current_object())
+        dispatcher.notify()
+
+
+def init_app(app):
+    """Register ``flask outbox`` commands and, if enabled, the in-process dispatcher."""
+    outbox_cli = click.Group('outbox', help='Inspect and drain the email outbox.')
+
+    @outbox_cli.command('dispatch')
+    @click.option('--once', is_flag=True, help='Drain what is due now, then exit.')
+    def dispatch_command(once):
+        """Deliver outbox messages (runs until interrupted unless --once)."""
+        connection = SMTPConnection()
+        if not connection.configured:
+            raise click.ClickException('MAIL_USERNAME / MAIL_PASSWORD are not set.')
+        try:
+            while True:
+                claimed = dispatch_batch(
+                    connection,
+                    batch_size=app.config['OUTBOX_BATCH_SIZE'],
+                    max_attempts=app.config['OUTBOX_MAX_ATTEMPTS'],
+                    backoff_base=app.config['OUTBOX_BACKOFF_BASE'],
+                )
+                if claimed:
+                    click.echo(f'Processed {claimed} message(s)')
+                    continue
+                if once:
+                    break
+                time.sleep(app.config['OUTBOX_POLL_INTERVAL'])
+        finally:
+            connection.close()
+
+    @outbox_cli.command('status')
+    def status_command():
+        """Show message counts by status."""
+        rows = db.session.query(OutboxMessage.status, func.count()).group_by(OutboxMessage.status)
+        for status, count in rows:
+            click.echo(f'{status:<8} {count}')
+
+    @outbox_cli.command('retry-dead')
+    def retry_dead_command():
+        """Move dead-lettered messages back to pending."""
+        count = OutboxMessage.query.filter_by(status='dead').update({
+            'status': 'pending', 'attempts': 0, 'next_attempt_at': datetime.utcnow(),
+        })
+        db.session.commit()
+        click.echo(f'Requeued {count} message(s)')
+
+    app.cli.add_command(outbox_cli)
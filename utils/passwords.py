@@ -0,0 +1,66 @@
+"""
+Password hashing with a per-process concurrency cap.
+
+Hashes are deliberately slow, so an unthrottled burst of logins can occupy
+every worker thread. At most ``PASSWORD_HASH_CONCURRENCY`` hashes run at once
+in a process; callers beyond that wait up to ``PASSWORD_HASH_WAIT`` seconds
+and then get ``HashingBusy``. New hashes use ``PASSWORD_HASH_METHOD``;
+``needs_rehash`` reports hashes made with anything else.
+"""
+
+import threading
+from contextlib import contextmanager
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HashingBusy(Exception):
+    """Too many password hashes are already running in this process."""
+
+
+class PasswordHasher:
+
+    def __init__(self, method=DEFAULT_METHOD, concurrency=2, wait=10):
+        self.configure(method, concurrency, wait)
+
+    def configure(self, method, concurrency, wait):
+        self.method = method
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._prefix = None
+
+    @contextmanager
+    def _slot(self):
+        if not self._slots.acquire(timeout=self.wait):
+            raise HashingBusy()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        with self._slot():
+            return generate_password_hash(password, method=self.method)
+
+    def verify(self, pwhash, password):
+        with self._slot():
+            return check_password_hash(pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` was not made with the configured method and cost."""
+        if self._prefix is None:
+            # werkzeug fills in default cost parameters, so learn the full prefix once
+            self._prefix = generate_password_hash('', method=self.method).split('$', 1)[0]
+        return pwhash.split('$', 1)[0] != self._prefix
+
+
+hasher = PasswordHasher()
+
+
+def init_app(app):
+    hasher.configure(
+        app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        app.config.get('PASSWORD_HASH_CONCURRENCY', 2),
+        app.config.get('PASSWORD_HASH_WAIT', 10),
+    )
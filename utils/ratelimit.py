@@ -0,0 +1,99 @@
+"""
+Token-bucket rate limiting.
+
+Each key (e.g. ``login-ip:203.0.113.7``) has a bucket of ``burst`` tokens
+that refills at ``per_minute`` tokens a minute; a request spends one token
+and is rejected when the bucket is empty. Buckets live in process memory by
+default, so each gunicorn worker limits on its own. Set
+``RATELIMIT_REDIS_URL`` (and ``pip install redis``) to share them across
+workers and hosts.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBucketStore:
+    """Per-process buckets, bounded to ``max_keys`` (least recently used go first)."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, burst, per_minute, now=None):
+        """Spend a token. Returns (allowed, seconds until one is available)."""
+        now = time.monotonic() if now is None else now
+        rate = per_minute / 60
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0 if allowed else math.ceil((1 - tokens) / rate)
+
+
+# KEYS[1] bucket; ARGV: burst, tokens per second, now (seconds), ttl
+_REDIS_TAKE = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local burst, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared through Redis, updated atomically by a Lua script."""
+
+    def __init__(self, url, prefix='tutorhub:ratelimit:'):
+        import redis  # optional dependency, only needed for a shared store
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_REDIS_TAKE)
+        self.prefix = prefix
+
+    def take(self, key, burst, per_minute, now=None):
+        rate = per_minute / 60
+        ttl = math.ceil(burst / rate) + 1
+        allowed, tokens = self._take(
+            keys=[self.prefix + key],
+            args=[burst, rate, time.time() if now is None else now, ttl],
+        )
+        tokens = float(tokens)
+        return bool(allowed), 0 if allowed else math.ceil((1 - tokens) / rate)
+
+
+class RateLimiter:
+    """Front end for the configured bucket store."""
+
+    def __init__(self):
+        self.store = MemoryBucketStore()
+        self.enabled = True
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        url = app.config.get('RATELIMIT_REDIS_URL')
+        self.store = RedisBucketStore(url) if url else MemoryBucketStore()
+
+    def hit(self, key, burst, per_minute):
+        """Spend a token from ``key``'s bucket. Returns (allowed, retry_after_seconds)."""
+        if not self.enabled:
+            return True, 0
+        return self.store.take(key, burst, per_minute)
+
+
+limiter = RateLimiter()
@@ -0,0 +1,145 @@
+"""
+Session reminders.
+
+Parents get an email 24 hours and 1 hour before each scheduled session. A
+single scheduler process (``flask reminders run``) scans for sessions whose
+next reminder is due, renders the emails in bulk and stages them in the
+outbox, which delivers them.
+
+``Session.reminder_stage`` records what has been sent (0 none, 1 day-before,
+2 hour-before) and is updated in the same transaction as the outbox rows, so
+a reminded session drops out of the ``ix_sessions_reminder_due`` range scan
+and is never looked at again for that stage.
+
+``Session.scheduled_at`` is the tutor's wall-clock time (slots are built from
+their local availability), so each scan compares it with "now" in every
+tutor timezone rather than with UTC.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import click
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload
+from database.db import db
+from database.models import Session, User
+from utils.email_service import SMTPConnection, booking_context, renderer
+from utils.outbox import add_messages
+
+# (stage, lead time, wording); the hour-before pass runs first so a session
+# booked at short notice only gets the closer reminder.
+REMINDERS = [
+    (2, timedelta(hours=1), 'in 1 hour'),
+    (1, timedelta(hours=24), 'tomorrow'),
+]
+
+
+# User.timezone's column default; also used for blank or unknown zone names
+DEFAULT_TIMEZONE = 'America/New_York'
+
+
+def _local_now(tz_name, now):
+    """``now`` (naive UTC) as naive wall-clock time in the zone ``tz_name``."""
+    try:
+        zone = ZoneInfo(tz_name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = ZoneInfo(DEFAULT_TIMEZONE)
+    return now.replace(tzinfo=dt_timezone.utc).astimezone(zone).replace(tzinfo=None)
+
+
+def _due_window(stage, lead, now, tz_name):
+    """Sessions of tutors in ``tz_name`` still needing reminder ``stage`` that start within ``lead``.
+
+    ``now`` is the wall-clock time in ``tz_name``.
+    """
+    earliest = now
+    for other_stage, other_lead, _ in REMINDERS:
+        if other_stage > stage:
+            # Closer reminders own the start of the window
+            earliest = max(earliest, now + other_lead)
+    tutor_zone = User.timezone.is_(None) if tz_name is None else User.timezone == tz_name
+    return Session.query.filter(
+        Session.user_id.in_(select(User.id).where(tutor_zone)),
+        Session.status == 'scheduled',
+        Session.reminder_stage.in_(range(stage)),
+        Session.scheduled_at > earliest,
+        Session.scheduled_at <= now + lead,
+    )
+
+
+def _reminder_context(session, lead_text):
+    tutor = session.tutor
+    context = booking_context(
+        tutor.full_name, session.student_display_name(), session.contact_email(),
+        session.scheduled_at, session.duration_minutes, session.session_type,
+        meeting_link=session.meeting_link or tutor.default_meeting_link,
+    )
+    context['lead'] = lead_text
+    context['location'] = session.location if session.session_type != 'online' else ''
+    return context
+
+
+def _send_zone_reminders(tz_name, local_now, chunk_size):
+    """Stage the due reminders for tutors in ``tz_name``. Returns how many sessions were processed."""
+    processed = 0
+    for stage, lead, lead_text in REMINDERS:
+        while True:
+            # Marked rows leave the window, so each chunk is the next one
+            sessions = _due_window(stage, lead, local_now, tz_name).options(
+                joinedload(Session.student), joinedload(Session.tutor),
+            ).order_by(Session.scheduled_at, Session.id).limit(chunk_size).all()
+            if not sessions:
+                break
+
+            recipients = [s for s in sessions if s.contact_email()]
+            emails = renderer.render_many(
+                'session_reminder', [_reminder_context(s, lead_text) for s in recipients],
+            )
+            add_messages([
+                (s.contact_email(), email, f'reminder:{s.id}:{stage}')
+                for s, email in zip(recipients, emails)
+            ])
+            db.session.execute(
+                update(Session)
+                .where(Session.id.in_([s.id for s in sessions]), Session.reminder_stage < stage)
+                .values(reminder_stage=stage),
+                execution_options={'synchronize_session': False},
+            )
+            db.session.commit()
+            processed += len(sessions)
+    return processed
+
+
+def send_due_reminders(chunk_size=500, now=None):
+    """Stage every due reminder in chunks of ``chunk_size``. Returns how many sessions were processed."""
+    now = now or datetime.utcnow()
+    processed = 0
+    tz_names = [tz_name for (tz_name,) in db.session.query(User.timezone).distinct()]
+    for tz_name in tz_names:
+        processed += _send_zone_reminders(tz_name, _local_now(tz_name, now), chunk_size)
+    return processed
+
+
+def init_app(app):
+    """Register the ``flask reminders`` commands."""
+    reminders_cli = click.Group('reminders', help='Schedule session reminder emails.')
+
+    @reminders_cli.command('run')
+    @click.option('--once', is_flag=True, help='Run one scan, then exit.')
+    def run_command(once):
+        """Scan for due reminders every REMINDER_INTERVAL seconds (one process only)."""
+        if not SMTPConnection().configured:
+            raise click.ClickException('MAIL_USERNAME / MAIL_PASSWORD are not set.')
+        while True:
+            started = time.monotonic()
+            processed = send_due_reminders(app.config['REMINDER_CHUNK_SIZE'])
+            if processed:
+                click.echo(f'Queued reminders for {processed} session(s) '
+                           f'in {time.monotonic() - started:.1f}s')
+            if once:
+                break
+            time.sleep(max(app.config['REMINDER_INTERVAL'] - (time.monotonic() - started), 0))
+
+    app.cli.add_command(reminders_cli)
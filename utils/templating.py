@@ -0,0 +1,71 @@
+"""
+Template compilation ahead of the first request.
+
+Jinja compiles each template to Python the first time it is rendered, which
+makes the first dashboard or booking page after a deploy or worker recycle
+noticeably slower. Two things remove that cost:
+
+* ``JINJA_BYTECODE_CACHE`` keeps compiled templates on disk
+  (``JINJA_BYTECODE_CACHE_DIR``, a per-user temp directory by default), so a
+  restarted process loads them instead of recompiling. Entries are keyed by
+  the template source, so edits are picked up.
+* ``JINJA_PRECOMPILE`` compiles every template inside ``create_app``. With
+  gunicorn's ``preload_app`` that happens once in the master, and every
+  forked (or recycled) worker starts with them already in memory.
+
+``flask templates compile`` does the same by hand and reports the timing.
+"""
+
+import os
+import time
+
+import click
+from jinja2 import FileSystemBytecodeCache
+
+from utils.email_service import renderer
+
+EMAIL_PREFIX = 'emails/'
+
+
+def _compile(env, names):
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def precompile(app):
+    """Compile every page template and email template. Returns how many were compiled."""
+    names = app.jinja_env.list_templates(extensions=['html', 'txt'])
+    # Emails use their own environment (see utils/email_service.py)
+    pages = [name for name in names if not name.startswith(EMAIL_PREFIX)]
+    emails = renderer.env.list_templates(filter_func=lambda name: name.startswith(EMAIL_PREFIX))
+    return _compile(app.jinja_env, pages) + _compile(renderer.env, emails)
+
+
+def init_app(app):
+    """Attach the bytecode cache, register ``flask templates`` and precompile if enabled."""
+    if app.config.get('JINJA_BYTECODE_CACHE', True):
+        directory = app.config.get('JINJA_BYTECODE_CACHE_DIR') or None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Cache keys ignore environment options, and the email environment
+        # compiles differently (trim_blocks), so each gets its own files
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory, 'tutorhub-page-%s.cache')
+        renderer.env.bytecode_cache = FileSystemBytecodeCache(directory, 'tutorhub-email-%s.cache')
+
+    templates_cli = click.Group('templates', help='Compile and cache Jinja templates.')
+
+    @templates_cli.command('compile')
+    def compile_command():
+        """Compile every template (fills the bytecode cache)."""
+        started = time.perf_counter()
+        count = precompile(app)
+        click.echo(f'Compiled {count} template(s) in {(time.perf_counter() - started) * 1000:.0f} ms')
+
+    app.cli.add_command(templates_cli)
+
+    if app.config.get('JINJA_PRECOMPILE'):
+        started = time.perf_counter()
+        count = precompile(app)
+        print(f'[TutorHub Templates] Precompiled {count} templates in '
+              f'{(time.perf_counter() - started) * 1000:.0f} ms')